@@ -0,0 +1,819 @@
+# Замеры производительности Online_edu.
+# Запуск: python benchmarks.py [число студентов]
+# Набор замеров для отслеживания регрессий (см. run_suite):
+#   python benchmarks.py --suite 1000 10000 --output results.json [--baseline old.json]
+import functools
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from Online_edu import (Course, EducationSystem, EnrollmentException, Homework, HomeworkSubmission, Lesson,
+                        NullEventSink, Payment, PaymentException, PrintEventSink, Question, Schedule,
+                        Student, Test, Tutor, set_event_sink)
+
+
+# построить систему заданного размера: у каждого студента 3 курса,
+# у каждого курса lessons_per_course уроков, половина студентов оплатила январь
+def _build_system(n_students: int, n_tutors: int = 100, n_courses: int = 500,
+                  lessons_per_course: int = 10) -> EducationSystem:
+    system = EducationSystem()
+    tutors = []
+    for i in range(n_tutors):
+        tutor = Tutor("Иван", "Петров" + _letters(i), 35, "89161234567",
+                      f"tutor{i}@edu.ru", i + 1, "Математика", 5, "Репетитор")
+        system.add_tutor(tutor)
+        tutors.append(tutor)
+
+    students = []
+    for i in range(n_students):
+        student = Student("Анна", "Иванова" + _letters(i), 16, "89161112233",
+                          f"student{i}@edu.ru", n_tutors + i + 1, 10)
+        system.add_student(student)
+        students.append(student)
+
+    courses = []
+    for i in range(n_courses):
+        course = tutors[i % n_tutors].create_course(f"Курс {i}", "Математика", "Описание",
+                                                    "18:00", "5000 руб", "active")
+        system.add_course(course)
+        courses.append(course)
+        for j in range(lessons_per_course):
+            lesson = Lesson(f"Урок {i}-{j}", "Описание", course, "18:00", "19:30",
+                            f"2024-01-{1 + j % 28:02d}")
+            course.add_lessons(lesson)
+            system.add_lesson(lesson)
+            if j == 0:
+                homework = Homework(f"Задание {i}", "Описание", lesson, "2024-02-01", 10)
+                lesson.add_homework(homework)
+                system.add_homework(homework)
+
+    for i, student in enumerate(students):
+        for k in range(3):
+            student.choose_a_course(courses[(i * 7 + k * 13) % n_courses])
+
+    for student in students[:n_students // 2]:
+        payment = Payment(student, "январь", 2024)
+        for course in student.enrolled_courses:
+            payment.add_course(course)
+        payment.process_payment()
+        system.add_payment(payment)
+    return system
+
+
+# буквенный суффикс для уникальных имён (имена должны состоять только из букв)
+def _letters(number: int) -> str:
+    return "".join(chr(ord("а") + int(digit)) for digit in str(number))
+
+
+# время выполнения функции и её пиковая память (tracemalloc).
+# Память меряется отдельным прогоном: tracemalloc сильно замедляет выполнение
+def _measure(func):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def _report(name: str, elapsed: float, peak: int = None):
+    line = f"{name:<32} {elapsed:12.6f} с"
+    if peak is not None:
+        line += f" {peak / 2 ** 20:9.1f} МБ"
+    print(line)
+
+
+def bench_save_to_xml(system: EducationSystem, workdir: str):
+    filename = os.path.join(workdir, "bench.xml")
+    _report("save_to_xml", *_measure(lambda: system.save_to_xml(filename)))
+
+
+# запись файлов в одном процессе и в workers процессах (по умолчанию - по числу ядер)
+def bench_parallel_export(system: EducationSystem, workdir: str, workers: int = None):
+    workers = workers or max(2, os.cpu_count() or 1)
+    for name, save in (("save_to_json", system.save_to_json), ("save_to_xml", system.save_to_xml)):
+        filename = os.path.join(workdir, "parallel." + name[-4:])
+        for count in (1, workers):
+            started = time.perf_counter()
+            save(filename, workers=count)
+            _report(f"{name}, процессов: {count}", time.perf_counter() - started)
+
+
+# Прежний путь загрузки XML: ET.parse строит дерево всего документа, и записи
+# секций загружаются из него (теми же загрузчиками записей, что у
+# load_from_xml); дерево остаётся в памяти до конца загрузки
+def _load_xml_full_tree(filename: str) -> EducationSystem:
+    import xml.etree.ElementTree as ET
+
+    loaded = EducationSystem()
+    root = ET.parse(filename).getroot()
+    links = loaded._new_links()
+    for key, tag, label, deps in loaded._SECTIONS:
+        section = root.find(key)
+        if section is not None:
+            load_element = getattr(loaded, f"_load_{tag}_element")
+            for elem in section.iterfind(tag):
+                load_element(elem, links)
+    loaded._restore_all_relationships(links)
+    return loaded
+
+
+# загрузка XML за один проход iterparse против построения дерева ET.parse:
+# время и пиковая память (load_from_xml ещё и проверяет контрольную сумму файла)
+def bench_load_from_xml(system: EducationSystem, workdir: str):
+    filename = os.path.join(workdir, "bench.xml")
+    system.save_to_xml(filename)
+    _report("load_from_xml (iterparse)", *_measure(lambda: EducationSystem().load_from_xml(filename)))
+    _report("load_from_xml (ET.parse)", *_measure(lambda: _load_xml_full_tree(filename)))
+
+
+def bench_load_from_json(system: EducationSystem, workdir: str):
+    filename = os.path.join(workdir, "bench.json")
+    system.save_to_json(filename)
+    _report("load_from_json", *_measure(lambda: EducationSystem().load_from_json(filename)))
+
+
+# проверка контрольной суммы файла перед загрузкой (часть load_from_json/load_from_xml)
+def bench_checksum(system: EducationSystem, workdir: str):
+    from Online_edu import _verify_file
+
+    for fmt in ("json", "xml"):
+        filename = os.path.join(workdir, "checksum." + fmt)
+        getattr(system, "save_to_" + fmt)(filename)
+        size = os.path.getsize(filename)
+        elapsed, peak = _measure(lambda: _verify_file(filename, fmt))
+        _report(f"проверка {fmt}, {size / 1e6:.1f} МБ", elapsed, peak)
+
+
+def bench_sqlite(system: EducationSystem, workdir: str):
+    filename = os.path.join(workdir, "bench.db")
+    _report("save_to_sqlite", *_measure(lambda: system.save_to_sqlite(filename)))
+    _report("load_from_sqlite (связи отложены)", *_measure(lambda: EducationSystem().load_from_sqlite(filename)))
+
+
+# Двоичный снимок против JSON: время записи и чтения, размер файла и во
+# сколько раз снимок быстрее и меньше. Около 10^6 объектов - python benchmarks.py 640000;
+# на 966 тыс. объектов (одно ядро): запись 5.2 с против 45.1 с (в 8.7 раза),
+# загрузка 10.6 с против 28.8 с (в 2.7 раза), файл 102 МБ против 473 МБ (в 4.6 раза)
+def bench_snapshot(system: EducationSystem, workdir: str):
+    json_filename = os.path.join(workdir, "bench.json")
+    snapshot_filename = os.path.join(workdir, "bench.snap")
+    elapsed = {}
+    for name, func in (("save_to_json", lambda: system.save_to_json(json_filename)),
+                       ("save_snapshot", lambda: system.save_snapshot(snapshot_filename)),
+                       ("load_from_json", lambda: EducationSystem().load_from_json(json_filename)),
+                       ("load_snapshot", lambda: EducationSystem().load_snapshot(snapshot_filename))):
+        elapsed[name], peak = _measure(func)
+        _report(name, elapsed[name], peak)
+    json_size, snapshot_size = os.path.getsize(json_filename), os.path.getsize(snapshot_filename)
+    print(f"{'размер JSON / снимка':<32} {json_size / 2 ** 20:9.1f} МБ / {snapshot_size / 2 ** 20:.1f} МБ "
+          f"(в {json_size / snapshot_size:.1f} раза меньше)")
+    print(f"{'снимок быстрее JSON':<32} запись в {elapsed['save_to_json'] / elapsed['save_snapshot']:.1f} раза, "
+          f"загрузка в {elapsed['load_from_json'] / elapsed['load_snapshot']:.1f} раза")
+
+
+# отчёт аналитического процесса (сумма оплат, распределение по классам):
+# полная загрузка снимка против чтения через mmap. Пиковая память - копия
+# данных в куче процесса; страницы mmap общие для всех процессов
+def bench_mapped_snapshot(system: EducationSystem, workdir: str):
+    from collections import Counter
+    from edu_snapshot import MappedSnapshot
+    filename = os.path.join(workdir, "bench.snap")
+
+    def report_loaded():
+        loaded = EducationSystem()
+        loaded.load_snapshot(filename)
+        return sum(payment.total_amount for payment in loaded.payments), Counter(s.grade for s in loaded.students)
+
+    def report_mapped():
+        with MappedSnapshot(filename) as snapshot:
+            return sum(snapshot.payments.column("total_amount")), Counter(snapshot.students.column("grade"))
+
+    system.save_snapshot(filename)
+    assert report_loaded() == report_mapped()
+    _report("отчёт: load_snapshot", *_measure(report_loaded))
+    _report("отчёт: MappedSnapshot", *_measure(report_mapped))
+
+
+# запись n студентов на один курс: проверка повторной записи не должна
+# зависеть от числа уже записанных студентов
+def bench_enroll_one_course(system: EducationSystem, workdir: str, n: int = 100000):
+    course = Course("Популярный курс", system.tutors[0], "Математика", "Описание", "18:00", "5000 руб", "active")
+    students = [Student("Анна", "Иванова", 16, "89161112233", f"s{i}@edu.ru", i, 10) for i in range(n)]
+
+    def enroll_all():
+        for student in students:
+            student.choose_a_course(course)
+
+    started = time.perf_counter()
+    enroll_all()
+    elapsed = time.perf_counter() - started
+    _report(f"запись {n} студентов на курс", elapsed)
+
+
+# запись в начале семестра: n студентов по 3 курса - цикл choose_a_course
+# против одного вызова bulk_enroll. 300 тыс. пар на одном ядре: цикл 0,7-1 с,
+# bulk_enroll 0,9-1,1 с (цикл до OrderedSet и приёмника событий - 19 с)
+def bench_bulk_enroll(system: EducationSystem, workdir: str, n: int = 100000):
+    def make_pairs():
+        courses = [Course(f"Курс {i}", system.tutors[0], "Математика", "Описание", "18:00", "5000 руб", "active")
+                   for i in range(50)]
+        students = [Student("Анна", "Иванова", 16, "89161112233", f"s{i}@edu.ru", i, 10) for i in range(n)]
+        return [(student, courses[(i + k * 7) % len(courses)]) for i, student in enumerate(students) for k in range(3)]
+
+    pairs = make_pairs()
+    started = time.perf_counter()
+    for student, course in pairs:
+        student.choose_a_course(course)
+    elapsed = time.perf_counter() - started
+    _report(f"запись {len(pairs)} пар: цикл", elapsed)
+
+    pairs = make_pairs()
+    started = time.perf_counter()
+    report = EducationSystem().bulk_enroll(pairs)
+    elapsed = time.perf_counter() - started
+    assert all(result["status"] == "enrolled" for result in report)
+    _report(f"запись {len(pairs)} пар: bulk_enroll", elapsed)
+
+
+# стоимость событий в горячем пути: n записей на курс с приёмником по умолчанию
+# (NullEventSink) и с выводом каждого события (PrintEventSink, как раньше print)
+def bench_event_sink(system: EducationSystem, workdir: str, n: int = 100000):
+    def enroll_all():
+        course = Course("Курс событий", system.tutors[0], "Математика", "Описание", "18:00", "5000 руб", "active")
+        students = [Student("Анна", "Иванова", 16, "89161112233", f"s{i}@edu.ru", i, 10) for i in range(n)]
+        started = time.perf_counter()
+        for student in students:
+            student.choose_a_course(course)
+        return time.perf_counter() - started
+
+    for name, sink in (("NullEventSink", NullEventSink()), ("PrintEventSink", PrintEventSink(file=io.StringIO()))):
+        previous = set_event_sink(sink)
+        try:
+            elapsed = enroll_all()
+        finally:
+            set_event_sink(previous)
+        _report(f"{n} записей: {name}", elapsed)
+
+
+# расписание репетитора на n уроков (по 8 в день, без пересечений): добавление
+# с проверкой пересечений и запросы по дате, по промежутку дат и по порядку
+def bench_schedule(system: EducationSystem, workdir: str, n: int = 20000, queries: int = 1000):
+    course = system.courses[0]
+    first_day = date(2024, 1, 1)
+    days = [(first_day + timedelta(days=i // 8)).isoformat() for i in range(n)]
+    lessons = [Lesson(f"Урок {i}", "Описание", course, f"{10 + i % 8}:00", f"{10 + i % 8}:45", days[i])
+               for i in range(n)]
+    schedule = Schedule(None, system.tutors[0])
+
+    started = time.perf_counter()
+    for lesson in lessons:
+        schedule.add_lesson(lesson)
+    _report(f"расписание: добавление {n} уроков", time.perf_counter() - started)
+
+    query_days = [days[i * n // queries] for i in range(queries)]
+    started = time.perf_counter()
+    for day in query_days:
+        schedule.get_lessons_by_date(day)
+    _report(f"расписание: {queries} запросов по дате", time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for day in query_days:
+        schedule.get_lessons_between(day, (date.fromisoformat(day) + timedelta(days=6)).isoformat())
+    _report(f"расписание: {queries} запросов за неделю", time.perf_counter() - started)
+
+    _report("расписание: get_upcoming_lessons", *_measure(schedule.get_upcoming_lessons))
+
+
+# Оплата n студентов за 12 месяцев (по 3 курса в платеже) через
+# EducationSystem.process_payment и отчёт о выручке за месяц: проход по
+# платежам против RevenueLedger
+def bench_revenue(system: EducationSystem, workdir: str, n: int = 10000):
+    months = ["январь", "февраль", "март", "апрель", "май", "июнь",
+              "июль", "август", "сентябрь", "октябрь", "ноябрь", "декабрь"]
+    students = system.students[:n]
+    revenue_system = EducationSystem()
+    started = time.perf_counter()
+    for month in months:
+        for student in students:
+            payment = Payment(student, month, 2024)
+            for course in student.enrolled_courses:
+                payment.add_course(course)
+            revenue_system.add_payment(payment)
+            revenue_system.process_payment(payment)
+    _report(f"{len(revenue_system.payments)} платежей", time.perf_counter() - started)
+
+    def scan():
+        return sum(payment.total_amount for payment in revenue_system.payments
+                   if payment.status == "paid" and payment.year == 2024 and payment.month == "март")
+
+    assert scan() == revenue_system.revenue.month(2024, "март")
+    _report("выручка за месяц: проход", *_measure(scan))
+    _report("выручка за месяц: RevenueLedger", *_measure(lambda: revenue_system.revenue.month(2024, "март")))
+
+
+# Оценки n работ: проценты, оценки, распределение и средние по курсам -
+# методами каждой работы против GradeAnalytics (NumPy, если установлен, и array)
+def bench_grade_analytics(system: EducationSystem, workdir: str, n: int = 2000000):
+    from edu_analytics import GradeAnalytics, np
+
+    students, homeworks = system.students, system.homeworks
+    submissions = []
+    for i in range(n):
+        submission = HomeworkSubmission(students[i % len(students)], homeworks[i % len(homeworks)],
+                                        "Ответ", "2024-01-20")
+        if i % 7:
+            submission.score = i % (submission.homework.max_score + 1)
+        submissions.append(submission)
+
+    def per_object():
+        letters = [submission.get_grade_letter() for submission in submissions]
+        distribution = {}
+        for letter in letters:
+            distribution[letter] = distribution.get(letter, 0) + 1
+        sums, counts = {}, {}
+        for submission in submissions:
+            if submission.score is not None:
+                course = submission.homework.lesson.course
+                sums[course] = sums.get(course, 0.0) + submission.get_score_percentage()
+                counts[course] = counts.get(course, 0) + 1
+        return letters, distribution, {course: sums[course] / counts[course] for course in sums}
+
+    def batch(use_numpy):
+        analytics = GradeAnalytics(submissions, use_numpy=use_numpy)
+        return analytics.letters(), analytics.distribution(), analytics.average_by_course()
+
+    started = time.perf_counter()
+    per_object()
+    _report(f"оценки {n} работ: по объектам", time.perf_counter() - started)
+    for use_numpy in ((True, False) if np is not None else (False,)):
+        started = time.perf_counter()
+        batch(use_numpy)
+        _report(f"оценки {n} работ: {'numpy' if use_numpy else 'array'}", time.perf_counter() - started)
+
+
+# Проверка n бланков теста из questions вопросов: calculate_score по одному
+# бланку против TestGrader (пачкой и потоком из файла ответов)
+def bench_test_grading(system: EducationSystem, workdir: str, n: int = 200000, questions: int = 40):
+    import random
+    from edu_analytics import TestGrader, np
+
+    test = Test("Экзамен", system.lessons[0])
+    rng = random.Random(1)
+    for i in range(questions):
+        test.add_question(Question(f"Вопрос {i}", ["1", "2", "3", "4"], rng.randrange(4)))
+    sheets = [[rng.randrange(4) for _ in range(questions)] for _ in range(n)]
+    filename = os.path.join(workdir, "answers.csv")
+    with open(filename, "w", encoding="utf-8") as f:
+        f.writelines(",".join(map(str, sheet)) + "\n" for sheet in sheets)
+
+    started = time.perf_counter()
+    expected = [test.calculate_score(sheet) for sheet in sheets]
+    _report(f"{n} бланков: calculate_score", time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
+            test.calculate_score(list(map(int, line.split(","))))
+    _report(f"{n} бланков: calculate_score, файл", time.perf_counter() - started)
+
+    ## проверка пачкой сравнивается с calculate_score без статистики;
+    ## статистика по вопросам - отдельный замер
+    for use_numpy in ((True, False) if np is not None else (False,)):
+        grader = TestGrader(test, use_numpy=use_numpy)
+        name = "numpy" if use_numpy else "array"
+        started = time.perf_counter()
+        scores = grader.grade(sheets)
+        _report(f"{n} бланков: {name}", time.perf_counter() - started)
+        assert list(scores) == expected
+        assert list(grader.grade(iter(sheets))) == expected
+
+        started = time.perf_counter()
+        grader.grade(sheets, grader.statistics())
+        _report(f"{n} бланков: {name} + статистика", time.perf_counter() - started)
+
+        if use_numpy:
+            matrix = np.array(sheets, dtype=np.int8)
+            started = time.perf_counter()
+            grader.grade(matrix, grader.statistics())
+            _report(f"{n} бланков: {name}, матрица", time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for _ in grader.grade_file(filename):
+            pass
+        _report(f"{n} бланков: {name}, файл", time.perf_counter() - started)
+
+
+# Пропускная способность потокобезопасного режима: threads потоков
+# записывают студентов на курсы (пары пересекаются между потоками) и
+# проводят одни и те же платежи (каждый платёж - в двух потоках); для
+# сравнения - то же без блокировок. Что обновления не теряются, проверяют
+# тесты tests/test_concurrency.py
+def bench_concurrency(system: EducationSystem, workdir: str, threads: int = 16, n: int = 20000):
+    import random
+    import threading
+
+    tutor = system.tutors[0]
+    for thread_safe in (True, False):
+        target = EducationSystem(thread_safe=thread_safe)
+        courses = [Course(f"Курс {i}", tutor, "Математика", "Описание", "18:00", "5000 руб", "active")
+                   for i in range(50)]
+        students = [Student("Анна", "Иванова", 16, "89161112233", f"s{i}@edu.ru", i, 10) for i in range(2000)]
+        payments = []
+        for i in range(n // 10):
+            payment = Payment(students[i % len(students)], "январь", 2024)
+            payment.add_course(courses[i % len(courses)])
+            target.add_payment(payment)
+            payments.append(payment)
+        rng = random.Random(1)
+        pairs = [(rng.choice(students), rng.choice(courses)) for _ in range(n)]
+
+        def work(index):
+            for student, course in pairs[index::threads] + pairs[index + 1::threads]:
+                try:
+                    target.enroll(student, course)
+                except EnrollmentException:
+                    pass
+            for payment in payments[index::threads] + payments[index + 1::threads]:
+                try:
+                    target.process_payment(payment)
+                except PaymentException:
+                    pass
+
+        workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        operations = 2 * (len(pairs) + len(payments))
+        mode = "с блокировками" if thread_safe else "без блокировок"
+        print(f"{'потоки ' + mode:<32} {elapsed:12.6f} с {operations / elapsed:10.0f} операций/с")
+
+
+# Задержка цикла событий asyncio во время сохранения и загрузки: задача-метроном
+# засыпает на 1 мс, задержка - насколько позже она просыпается. Обычный
+# save_to_json из сопрограммы останавливает цикл на всё время записи
+def bench_async_io(system: EducationSystem, workdir: str, tick: float = 0.001):
+    import asyncio
+
+    filename = os.path.join(workdir, "async.json")
+
+    async def ticker(lags, stop):
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            started = loop.time()
+            await asyncio.sleep(tick)
+            lags.append(loop.time() - started - tick)
+
+    async def measure(name, operation):
+        lags = []
+        stop = asyncio.Event()
+        metronome = asyncio.create_task(ticker(lags, stop))
+        await asyncio.sleep(tick * 10)
+        lags.clear()
+        started = time.perf_counter()
+        result = operation()
+        if asyncio.iscoroutine(result):
+            await result
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(tick * 2)
+        stop.set()
+        await metronome
+        lags.sort()
+        p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+        print(f"{name:<32} {elapsed:12.6f} с  задержка цикла p99 {p99 * 1000:8.2f} мс, "
+              f"макс. {lags[-1] * 1000 if lags else 0.0:8.2f} мс")
+
+    async def run():
+        loaded = EducationSystem()
+        await measure("save_to_json в цикле", lambda: system.save_to_json(filename))
+        await measure("asave_json", lambda: system.asave_json(filename))
+        await measure("asave_xml", lambda: system.asave_xml(filename + ".xml"))
+        await measure("aload_json", lambda: loaded.aload_json(filename))
+        assert len(loaded.students) == len(system.students)
+
+    asyncio.run(run())
+
+
+# Объект прежнего вида (до __slots__ и ленивых связей): те же атрибуты в
+# __dict__ объекта класса без слотов, а пустые списки связей и личное
+# расписание человека создаются сразу, как в конструкторах до перехода на слоты
+@functools.lru_cache(maxsize=None)
+def _dict_class(cls):
+    return type(cls.__name__ + "Dict", (), {})
+
+
+def _dict_entity(item):
+    from Online_edu import _LazyRelation
+
+    cls = type(item)
+    relations = {relation.attr: relation for klass in cls.__mro__ for relation in vars(klass).values()
+                 if isinstance(relation, _LazyRelation)}
+    entity = _dict_class(cls)()
+    for klass in reversed(cls.__mro__):
+        for slot in getattr(klass, "__slots__", ()):
+            if slot in relations:
+                value = {} if relations[slot].factory is dict else []
+            elif slot == "_schedule":
+                value = _dict_entity(Schedule(student=item, tutor=None) if isinstance(item, Student)
+                                     else Schedule(student=None, tutor=item))
+            else:
+                value = getattr(item, slot, None)
+            setattr(entity, slot, value)
+    return entity
+
+
+# Память на один объект каждого класса: n объектов создаются под tracemalloc и
+# остаются в списке (в замер входят и строки, созданные для объекта). "до" -
+# такие же объекты прежнего вида (_dict_entity), "после" - классы со слотами
+def bench_entity_memory(system: EducationSystem, workdir: str, n: int = 10000):
+    tutor, student = system.tutors[0], system.students[0]
+    course, lesson, homework = system.courses[0], system.lessons[0], system.homeworks[0]
+    factories = {
+        "Student": lambda i: Student("Анна", "Иванова", 16, "89161112233", f"s{i}@edu.ru", i, 10),
+        "Tutor": lambda i: Tutor("Иван", "Петров", 35, "89161234567", f"t{i}@edu.ru", i, "Математика", 5, "Репетитор"),
+        "Course": lambda i: Course(f"Курс {i}", tutor, "Математика", "Описание", "18:00", "5000 руб", "active"),
+        "Lesson": lambda i: Lesson(f"Урок {i}", "Описание", course, "18:00", "19:30", "2024-01-01"),
+        "Homework": lambda i: Homework(f"Задание {i}", "Описание", lesson, "2024-02-01", 10),
+        "HomeworkSubmission": lambda i: HomeworkSubmission(student, homework, "Ответ", "2024-01-20"),
+        "Payment": lambda i: Payment(student, "январь", 2024),
+        "Question": lambda i: Question("Вопрос", ["1", "2"], 0),
+    }
+
+    def size_of(make) -> float:
+        tracemalloc.start()
+        objects = [make(i) for i in range(n)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del objects
+        return size / n
+
+    for name, factory in factories.items():
+        before = size_of(lambda i: _dict_entity(factory(i)))
+        after = size_of(factory)
+        print(f"{'память: ' + name:<32} {before:8.0f} -> {after:.0f} байт ({after / before:.0%})")
+
+
+# Время сохранения и загрузки во всех форматах для системы замеров и для
+# seeds сгенерированных систем того же размера. Что загрузка возвращает ту же
+# систему, проверяют тесты tests/test_round_trip.py
+_ROUND_TRIP_FORMATS = (
+    ("json", "save_to_json", "load_from_json"),
+    ("xml", "save_to_xml", "load_from_xml"),
+    ("snap", "save_snapshot", "load_snapshot"),
+    ("db", "save_to_sqlite", "load_from_sqlite"),
+)
+
+
+def bench_round_trip(system: EducationSystem, workdir: str, seeds: int = 3):
+    from edu_generator import generate_system
+
+    systems = [("замеры", system)] + [(f"seed {seed}", generate_system(len(system.students), seed=seed))
+                                       for seed in range(seeds)]
+    for name, source in systems:
+        started = time.perf_counter()
+        for ext, save, load in _ROUND_TRIP_FORMATS:
+            filename = os.path.join(workdir, "round_trip." + ext)
+            if os.path.exists(filename):
+                os.remove(filename)
+            loaded = EducationSystem()
+            getattr(source, save)(filename)
+            getattr(loaded, load)(filename)
+        _report(f"сохранение и загрузка: {name}", time.perf_counter() - started)
+
+
+# стоимость одного изменения: запись в журнал против полного сохранения снимка
+def bench_journal(system: EducationSystem, workdir: str):
+    journal = os.path.join(workdir, "bench.journal")
+    course = system.courses[0]
+    students = [student for student in system.students if course not in student.enrolled_courses][:1000]
+
+    def enroll_all():
+        system.open_journal(journal)
+        for student in students:
+            system.enroll(student, course)
+        system.close_journal()
+
+    started = time.perf_counter()
+    enroll_all()
+    elapsed = time.perf_counter() - started
+    _report("journal: 1 запись на курс", elapsed / max(len(students), 1))
+    _report("save_to_json: 1 снимок", _measure(lambda: system.save_to_json(os.path.join(workdir, "snap.json")))[0])
+
+
+# Допустимое время импорта Online_edu в новом интерпретаторе (секунды)
+IMPORT_TIME_BUDGET = 0.2
+
+# Импорт в отдельном процессе: аудит-хук фиксирует все открытия файлов,
+# кроме чтения модулей и байт-кода
+_IMPORT_PROBE = """
+import sys, time
+opened = []
+def hook(event, args):
+    if event == "open":
+        path, mode = str(args[0]), args[1] or "r"
+        if set(mode) & set("wax+") or not path.endswith((".py", ".pyc", ".so", ".pyd")):
+            opened.append((path, mode))
+sys.addaudithook(hook)
+started = time.perf_counter()
+import Online_edu
+print(repr((time.perf_counter() - started, opened)))
+"""
+
+
+# импорт модуля не должен читать и писать файлы данных и должен укладываться в бюджет времени
+def bench_import(system: EducationSystem, workdir: str):
+    import ast
+    import subprocess
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], cwd=workdir, env=env,
+                            capture_output=True, text=True, check=True)
+    elapsed, opened = ast.literal_eval(result.stdout.strip().splitlines()[-1])
+    _report("import Online_edu", elapsed)
+    assert not opened, f"импорт Online_edu открывает файлы: {opened}"
+    assert elapsed <= IMPORT_TIME_BUDGET, \
+        f"импорт Online_edu занял {elapsed:.3f} с (бюджет {IMPORT_TIME_BUDGET} с)"
+
+
+BENCHMARKS = [
+    bench_import,
+    bench_load_from_json,
+    bench_save_to_xml,
+    bench_load_from_xml,
+    bench_parallel_export,
+    bench_checksum,
+    bench_round_trip,
+    bench_sqlite,
+    bench_snapshot,
+    bench_mapped_snapshot,
+    bench_journal,
+    bench_enroll_one_course,
+    bench_bulk_enroll,
+    bench_event_sink,
+    bench_schedule,
+    bench_revenue,
+    bench_grade_analytics,
+    bench_test_grading,
+    bench_concurrency,
+    bench_async_io,
+    bench_entity_memory,
+]
+
+
+# Набор замеров для отслеживания регрессий: системы из edu_generator на
+# scales студентов, для каждой - сохранение и загрузка JSON/XML, запись на
+# курсы, проведение платежей и запросы к расписаниям. Результаты - список
+# записей {"scale", "benchmark", "seconds", "operations", "per_second"} (для
+# сохранения и загрузки операции - объекты системы). Для 10^6 студентов нужно
+# около 4 ГБ памяти: исходная и загруженная системы находятся в памяти вместе
+SUITE_SCALES = (1000, 10000, 100000, 1000000)
+SUITE_FORMAT = 1
+
+# замедление относительно прошлого прогона, которое считается регрессией;
+# замеры короче SUITE_MIN_SECONDS не сравниваются (шум таймера)
+REGRESSION_TOLERANCE = 1.25
+SUITE_MIN_SECONDS = 0.001
+
+
+def run_suite(scales=SUITE_SCALES, seed: int = 0, enrollments: int = 10000, queries: int = 1000) -> dict:
+    import platform
+    from datetime import datetime
+    from edu_generator import default_counts
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in scales:
+            _suite_scale(results, scale, workdir, seed, enrollments, queries)
+    return {
+        "format": SUITE_FORMAT,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "counts": {str(scale): default_counts(scale) for scale in scales},
+        "results": results,
+    }
+
+
+# замеры на одной системе; система освобождается при выходе из функции
+def _suite_scale(results: list, scale: int, workdir: str, seed: int, enrollments: int, queries: int):
+    from edu_generator import generate_system
+
+    def timed(name: str, operations: int, func):
+        started = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - started
+        results.append({"scale": scale, "benchmark": name, "seconds": elapsed, "operations": operations,
+                        "per_second": operations / elapsed if elapsed > 0 else None})
+        _report(f"{name} ({scale})", elapsed)
+        return value
+
+    system = timed("generate_system", scale, lambda: generate_system(scale, seed=seed))
+    objects = sum(len(items) for key, items in system._export_sections())
+    for fmt in ("json", "xml"):
+        filename = os.path.join(workdir, "suite." + fmt)
+        timed("save_to_" + fmt, objects, lambda: getattr(system, "save_to_" + fmt)(filename))
+        results[-1]["bytes"] = os.path.getsize(filename)
+        timed("load_from_" + fmt, objects, lambda: getattr(EducationSystem(), "load_from_" + fmt)(filename))
+        os.remove(filename)
+
+    pairs = _new_enrollments(system, min(enrollments, scale))
+    timed("enroll", len(pairs), lambda: [system.enroll(student, course) for student, course in pairs])
+    pairs = _new_enrollments(system, scale)
+    timed("bulk_enroll", len(pairs), lambda: system.bulk_enroll(pairs))
+
+    pending = [payment for payment in system.payments if payment.status == "pending"]
+    timed("process_payment", len(pending), lambda: [system.process_payment(payment) for payment in pending])
+
+    rng = random.Random(seed)
+    schedules = [schedule for schedule in system.schedules if schedule.lessons]
+    lookups = []
+    for schedule in rng.choices(schedules, k=queries):
+        lookups.append((schedule, rng.choice(schedule.lessons).date))
+    timed("schedule_by_date", queries, lambda: [schedule.get_lessons_by_date(day) for schedule, day in lookups])
+    timed("schedule_between", queries,
+          lambda: [schedule.get_lessons_between(day, day + timedelta(days=6)) for schedule, day in lookups])
+
+
+# n пар (студент, курс), в которых студент ещё не записан на курс
+def _new_enrollments(system: EducationSystem, n: int) -> list:
+    students, courses = system.students, system.courses
+    pairs = []
+    for i in range(len(students)):
+        student = students[i]
+        course = courses[(i * 7 + len(student.enrolled_courses) * 13 + 1) % len(courses)]
+        if course not in student.enrolled_courses:
+            pairs.append((student, course))
+            if len(pairs) == n:
+                break
+    return pairs
+
+
+# Сравнить результаты с прошлым прогоном: замеры, которые стали медленнее в
+# tolerance раз и больше (сравниваются одинаковые scale и benchmark)
+def compare_results(current: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> list:
+    previous = {(entry["scale"], entry["benchmark"]): entry["seconds"] for entry in baseline["results"]}
+    regressions = []
+    for entry in current["results"]:
+        before = previous.get((entry["scale"], entry["benchmark"]))
+        if before is None or max(before, entry["seconds"]) < SUITE_MIN_SECONDS:
+            continue
+        ratio = entry["seconds"] / before if before > 0 else float("inf")
+        if ratio >= tolerance:
+            regressions.append({"scale": entry["scale"], "benchmark": entry["benchmark"],
+                                "seconds": entry["seconds"], "baseline_seconds": before, "ratio": ratio})
+    return regressions
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Замеры производительности Online_edu")
+    parser.add_argument("students", nargs="?", type=int, default=10000, help="число студентов (все замеры)")
+    parser.add_argument("--suite", nargs="*", type=int, metavar="SCALE",
+                        help=f"набор замеров на синтетических системах (по умолчанию {SUITE_SCALES})")
+    parser.add_argument("--seed", type=int, default=0, help="начальное значение генератора данных")
+    parser.add_argument("--output", help="файл для результатов набора замеров (JSON)")
+    parser.add_argument("--baseline", help="результаты прошлого прогона для поиска регрессий")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="допустимое замедление относительно прошлого прогона")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.suite is None:
+        system = _build_system(args.students)
+        print(f"Студентов: {len(system.students)}, курсов: {len(system.courses)}, уроков: {len(system.lessons)}")
+        with tempfile.TemporaryDirectory() as workdir:
+            for bench in BENCHMARKS:
+                bench(system, workdir)
+        return 0
+
+    results = run_suite(args.suite or SUITE_SCALES, seed=args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_results(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"регрессия: {regression['benchmark']} ({regression['scale']}): "
+                  f"{regression['baseline_seconds']:.6f} с -> {regression['seconds']:.6f} с "
+                  f"(в {regression['ratio']:.2f} раза)")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
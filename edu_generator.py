@@ -0,0 +1,211 @@
+# Синтетические данные для EducationSystem.
+# generate_system строит систему заданного размера, похожую на настоящую:
+# у репетитора несколько курсов в разные дни недели, уроки курса идут раз в
+# неделю весь учебный год, у части уроков есть задания и тесты, студенты
+# записаны на несколько курсов и сдают задания своих курсов, платежи за
+# сентябрь частью проведены. Случайные значения берутся из random.Random(seed),
+# поэтому один и тот же seed даёт одну и ту же систему.
+# Запуск: python edu_generator.py --students 10000 --json system.json
+import random
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from Online_edu import (EducationSystem, Homework, HomeworkSubmission, Lesson, Payment, Question, Schedule,
+                        Student, Test, Tutor)
+
+FIRST_NAMES = ("Анна", "Мария", "Елена", "Ольга", "Дарья", "Иван", "Пётр", "Алексей", "Сергей", "Михаил")
+LAST_NAMES = ("Иванов", "Петров", "Смирнов", "Кузнецов", "Попов", "Соколов", "Лебедев", "Козлов", "Новиков",
+              "Морозов")
+SUBJECTS = ("Математика", "Физика", "Химия", "Биология", "Информатика", "Английский язык", "История")
+PRICES = ("4000 руб", "5000 руб", "6 500 руб", "7500,50 руб")
+MONTH = "сентябрь"
+
+# первый учебный день (понедельник)
+FIRST_DAY = date(2024, 9, 2)
+
+
+# Число объектов каждого вида для системы на students студентов; явно
+# переданные в generate_system значения заменяют эти
+def default_counts(students: int) -> Dict[str, int]:
+    return {
+        "students": students,
+        "tutors": max(1, students // 100),
+        "courses": max(1, students // 20),
+        "lessons_per_course": 10,
+        "homeworks": max(1, students // 10),
+        "tests": max(1, students // 50),
+        "questions_per_test": 5,
+        "courses_per_student": 3,
+        "submissions": students,
+        "payments": students // 2,
+    }
+
+
+def generate_system(students: int = 1000, tutors: Optional[int] = None, courses: Optional[int] = None,
+                    lessons_per_course: Optional[int] = None, homeworks: Optional[int] = None,
+                    tests: Optional[int] = None, submissions: Optional[int] = None,
+                    payments: Optional[int] = None, seed: int = 0, schedules: bool = True,
+                    paid_share: float = 0.7) -> EducationSystem:
+    counts = default_counts(students)
+    for key, value in (("tutors", tutors), ("courses", courses), ("lessons_per_course", lessons_per_course),
+                       ("homeworks", homeworks), ("tests", tests), ("submissions", submissions),
+                       ("payments", payments)):
+        if value is not None:
+            counts[key] = value
+
+    rng = random.Random(seed)
+    system = EducationSystem()
+    tutor_list = _add_tutors(system, rng, counts["tutors"])
+    student_list = _add_students(system, rng, counts["students"], len(tutor_list) + 1)
+    course_list = _add_courses(system, rng, tutor_list, counts["courses"], counts["lessons_per_course"])
+    _enroll(system, rng, student_list, course_list, counts["courses_per_student"])
+    course_homeworks = _add_homeworks(system, rng, counts["homeworks"])
+    _add_tests(system, rng, counts["tests"], counts["questions_per_test"])
+    _add_submissions(system, rng, student_list, course_homeworks, counts["submissions"])
+    _add_payments(system, rng, student_list, counts["payments"], paid_share)
+    if schedules:
+        _add_schedules(system, tutor_list)
+    return system
+
+
+def _phone(rng: random.Random) -> str:
+    return f"89{rng.randrange(10 ** 9):09d}"
+
+
+def _add_tutors(system: EducationSystem, rng: random.Random, count: int):
+    tutors = []
+    for i in range(count):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        tutor = Tutor(first_name, last_name, rng.randint(23, 65), _phone(rng), f"tutor{i}@edu.ru", i + 1,
+                      rng.choice(SUBJECTS), rng.randint(0, 30), f"Репетитор, стаж {rng.randint(1, 30)} лет")
+        system.add_tutor(tutor)
+        tutors.append(tutor)
+    return tutors
+
+
+def _add_students(system: EducationSystem, rng: random.Random, count: int, first_user_id: int):
+    students = []
+    for i in range(count):
+        grade = rng.randint(5, 11)
+        student = Student(rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), grade + 6, _phone(rng),
+                          f"student{i}@edu.ru", first_user_id + i, grade)
+        system.add_student(student)
+        students.append(student)
+    return students
+
+
+# Курсы распределяются по репетиторам по кругу; k-й курс репетитора идёт в
+# свой день недели и час, поэтому уроки одного репетитора не пересекаются
+def _add_courses(system: EducationSystem, rng: random.Random, tutors, count: int, lessons_per_course: int):
+    courses = []
+    for i in range(count):
+        tutor = tutors[i % len(tutors)]
+        slot = i // len(tutors)
+        hour = 9 + slot // 5 % 12
+        course = tutor.create_course(f"{tutor.subject}: группа {i + 1}", tutor.subject,
+                                     f"Курс {tutor.subject.lower()} для {rng.randint(5, 11)} класса",
+                                     f"{hour:02d}:00", rng.choice(PRICES), "active")
+        system.add_course(course)
+        courses.append(course)
+        first_day = FIRST_DAY + timedelta(days=slot % 5)
+        for week in range(lessons_per_course):
+            lesson = Lesson(f"Урок {week + 1}", f"Тема {week + 1}", course, f"{hour:02d}:00", f"{hour:02d}:45",
+                            first_day + timedelta(weeks=week))
+            course.lesson.append(lesson)
+            system.add_lesson(lesson)
+    return courses
+
+
+def _enroll(system: EducationSystem, rng: random.Random, students, courses, per_student: int):
+    per_student = min(per_student, len(courses))
+    system.bulk_enroll((student, course) for student in students
+                       for course in rng.sample(courses, rng.randint(1, per_student) if per_student else 0))
+
+
+# задания к случайным урокам; возвращает задания по курсам (для сданных работ)
+def _add_homeworks(system: EducationSystem, rng: random.Random, count: int) -> Dict:
+    course_homeworks = {}
+    lessons = system.lessons
+    for i in range(count if lessons else 0):
+        lesson = rng.choice(lessons)
+        homework = Homework(f"Задание {i + 1}", f"Задачи к теме «{lesson.description}»", lesson,
+                            lesson.date + timedelta(days=7), rng.choice((5, 10, 20, 100)))
+        if rng.random() < 0.3:
+            homework.attachments.append(f"задание_{i + 1}.pdf")
+        lesson.homeworks.append(homework)
+        system.add_homework(homework)
+        course_homeworks.setdefault(lesson.course, []).append(homework)
+    return course_homeworks
+
+
+def _add_tests(system: EducationSystem, rng: random.Random, count: int, questions: int):
+    lessons = system.lessons
+    for i in range(count if lessons else 0):
+        test = Test(f"Тест {i + 1}", rng.choice(lessons))
+        for number in range(questions):
+            a, b = rng.randint(1, 50), rng.randint(1, 50)
+            options = [str(a + b + shift) for shift in (-1, 0, 1, 2)]
+            rng.shuffle(options)
+            test.add_question(Question(f"{a} + {b} = ?", options, options.index(str(a + b))))
+        system.add_test(test)
+
+
+# работы студентов по заданиям их курсов: большинство сдано в срок, оценки
+# смещены к высоким, часть работ ещё не проверена
+def _add_submissions(system: EducationSystem, rng: random.Random, students, course_homeworks: Dict, count: int):
+    candidates = [student for student in students
+                  if any(course in course_homeworks for course in student.enrolled_courses)]
+    for _ in range(count if candidates else 0):
+        student = rng.choice(candidates)
+        course = rng.choice([course for course in student.enrolled_courses if course in course_homeworks])
+        homework = rng.choice(course_homeworks[course])
+        submitted = homework.deadline - timedelta(days=rng.randint(-2, 6))
+        submission = HomeworkSubmission(student, homework, f"Решение: {rng.randint(1, 10 ** 6)}", submitted)
+        if rng.random() < 0.8:
+            submission.score = min(homework.max_score, round(homework.max_score * rng.betavariate(5, 2)))
+            if rng.random() < 0.3:
+                submission.feedback = rng.choice(("Хорошо", "Есть ошибки в решении", "Отлично!"))
+        system.add_submission(submission)
+
+
+# платежи за месяц по всем курсам студента; доля paid_share проведена
+def _add_payments(system: EducationSystem, rng: random.Random, students, count: int, paid_share: float):
+    payers = [student for student in students if student.enrolled_courses]
+    for student in rng.sample(payers, min(count, len(payers))):
+        payment = Payment(student, MONTH, FIRST_DAY.year)
+        for course in student.enrolled_courses:
+            payment.add_course(course)
+        if rng.random() < paid_share:
+            payment.process_payment()
+        system.add_payment(payment)
+
+
+# расписание каждого репетитора - уроки его курсов (не пересекаются по
+# построению, см. _add_courses, поэтому без проверки пересечений)
+def _add_schedules(system: EducationSystem, tutors):
+    for tutor in tutors:
+        schedule = Schedule(student=None, tutor=tutor)
+        for course in tutor.courses_taught:
+            for lesson in course.lesson:
+                schedule.add_lesson(lesson, check_conflicts=False)
+        system.add_schedule(schedule)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Синтетическая система для замеров")
+    parser.add_argument("--students", type=int, default=1000, help="число студентов")
+    parser.add_argument("--seed", type=int, default=0, help="начальное значение генератора")
+    parser.add_argument("--json", help="сохранить в JSON")
+    parser.add_argument("--xml", help="сохранить в XML")
+    parser.add_argument("--snapshot", help="сохранить двоичный снимок")
+    args = parser.parse_args()
+    generated = generate_system(args.students, seed=args.seed)
+    print(", ".join(f"{key}: {len(items)}" for key, items in generated._export_sections()))
+    if args.json:
+        generated.save_to_json(args.json)
+    if args.xml:
+        generated.save_to_xml(args.xml)
+    if args.snapshot:
+        generated.save_snapshot(args.snapshot)
@@ -0,0 +1,569 @@
+# Двоичный снимок EducationSystem.
+# Файл состоит из столбцов фиксированной ширины (модуль array): каждый атрибут
+# каждой секции хранится отдельным столбцом, строки - номерами в общей таблице
+# строк, ссылки на объекты - позициями объектов в списках системы, связи
+# (Course.students и т.п.) - парой столбцов смещений и позиций.
+#
+# Формат (little-endian):
+#   заголовок      MAGIC, версия (uint32), число столбцов (uint32)
+#   каталог        для каждого столбца: имя (48 байт), код типа array, число
+#                  элементов, смещение данных от начала файла
+#   данные         столбцы подряд, начало каждого выровнено на 8 байт
+#   контрольная    SHA-256 всего, что записано до неё (32 байта)
+#   сумма
+# Столбцы можно читать прямо из mmap без разбора всего файла (MappedSnapshot);
+# load_snapshot проверяет контрольную сумму до создания объектов
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+from datetime import date, datetime, time
+from itertools import accumulate
+from typing import Dict, List, Optional
+
+from Online_edu import (Course, EducationException, EducationSystem, Homework, HomeworkSubmission, Lesson,
+                        Payment, Question, Schedule, Student, Test, Tutor, _ChecksumWriter, _LazyRelation,
+                        _atomic_file)
+
+MAGIC = b"EDUSNAP\x01"
+VERSION = 4
+
+_HEADER = struct.Struct("<8sII")
+_ENTRY = struct.Struct("<48sc7xQQ")
+_ALIGN = 8
+_CHECKSUM_SIZE = hashlib.sha256().digest_size
+
+# отсутствующая строка, ссылка или необязательное число
+NONE = -1
+
+# Скалярные столбцы секций: (атрибут, тип). Типы: "s" - строка, "t" - дата и время
+# (строка в формате ISO), "D" - дата (номер дня), "S" - время суток (секунды от
+# полуночи), остальные - коды типов модуля array
+COLUMNS = {
+    "students": (("first_name", "s"), ("last_name", "s"), ("age", "i"), ("phone", "s"), ("email", "s"),
+                 ("user_id", "q"), ("grade", "i")),
+    "tutors": (("first_name", "s"), ("last_name", "s"), ("age", "i"), ("phone", "s"), ("email", "s"),
+               ("user_id", "q"), ("subject", "s"), ("experience", "i"), ("bio", "s")),
+    "courses": (("id", "q"), ("name", "s"), ("subject", "s"), ("description", "s"), ("time", "s"), ("month_price", "s"),
+                ("status", "s")),
+    "lessons": (("id", "q"), ("name", "s"), ("description", "s"), ("start_time", "S"), ("end_time", "S"), ("date", "D")),
+    "homeworks": (("id", "q"), ("title", "s"), ("description", "s"), ("deadline", "D"), ("max_score", "i")),
+    "tests": (("id", "q"), ("title", "s")),
+    "questions": (("text", "s"), ("correct_answer", "i")),
+    "submissions": (("id", "q"), ("answer", "s"), ("submitted_date", "D"), ("score", "i"), ("feedback", "s")),
+    "payments": (("id", "q"), ("month", "s"), ("year", "i"), ("total_amount", "d"), ("status", "s"), ("payment_date", "t")),
+    "schedules": (("id", "q"),),
+}
+
+
+def _time_seconds(value: time) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def _seconds_time(seconds: int) -> time:
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+# типы, которые хранятся в столбцах "i": тип -> (в число, из числа)
+_CODECS = {"D": (date.toordinal, date.fromordinal), "S": (_time_seconds, _seconds_time)}
+
+# необязательные числовые атрибуты: NONE в столбце означает None
+OPTIONAL = (("submissions", "score"),)
+
+# ссылки на объекты других секций: (атрибут, секция)
+REFERENCES = {
+    "courses": (("tutor", "tutors"),),
+    "lessons": (("course", "courses"),),
+    "homeworks": (("lesson", "lessons"),),
+    "tests": (("lesson", "lessons"),),
+    "submissions": (("student", "students"), ("homework", "homeworks")),
+    "payments": (("student", "students"),),
+    "schedules": (("student", "students"), ("tutor", "tutors")),
+}
+
+# связи-списки: (атрибут, секция элементов; "strings" - список строк)
+RELATIONS = {
+    "students": (("enrolled_courses", "courses"),),
+    "tutors": (("courses_taught", "courses"),),
+    "courses": (("students", "students"), ("lesson", "lessons")),
+    "lessons": (("homeworks", "homeworks"),),
+    "homeworks": (("attachments", "strings"),),
+    "tests": (("questions", "questions"),),
+    "questions": (("options", "strings"),),
+    "payments": (("courses", "courses"),),
+    "schedules": (("lessons", "lessons"),),
+}
+
+
+# Запись снимка: столбцы собираются в памяти и пишутся в файл одним проходом
+class _SnapshotWriter:
+    def __init__(self):
+        self.columns: List = []
+        # номера строк; None - отсутствующая строка
+        self._strings: Dict[Optional[str], int] = {None: NONE}
+
+    def string_ids(self, values) -> List[int]:
+        strings = self._strings
+        setdefault = strings.setdefault
+        return [setdefault(value, len(strings) - 1) for value in values]
+
+    def add(self, name: str, typecode: str, values):
+        if len(name.encode("ascii")) > 48:
+            raise EducationException(f"Слишком длинное имя столбца снимка: {name}")
+        self.columns.append((name, typecode, array(typecode, values)))
+
+    def add_section(self, key: str, items: List, ids: Dict):
+        for attr, kind in COLUMNS[key]:
+            values = [getattr(item, attr) for item in items]
+            if kind == "s":
+                self.add(f"{key}.{attr}", "i", self.string_ids(values))
+            elif kind == "t":
+                self.add(f"{key}.{attr}", "i",
+                         self.string_ids(value.isoformat() if value is not None else None for value in values))
+            elif kind in _CODECS:
+                encode = _CODECS[kind][0]
+                self.add(f"{key}.{attr}", "i", [encode(value) for value in values])
+            else:
+                self.add(f"{key}.{attr}", kind, [NONE if value is None else value for value in values])
+        for attr, target in REFERENCES.get(key, ()):
+            self.add(f"{key}.{attr}", "i", [ids.get(getattr(item, attr), NONE) for item in items])
+        for attr, target in RELATIONS.get(key, ()):
+            offsets = [0]
+            targets = []
+            for item in items:
+                if target == "strings":
+                    targets += self.string_ids(getattr(item, attr))
+                else:
+                    targets += [ids[value] for value in getattr(item, attr) if value in ids]
+                offsets.append(len(targets))
+            self.add(f"{key}.{attr}.offsets", "i", offsets)
+            self.add(f"{key}.{attr}", "i", targets)
+
+    # Таблица строк: строки в UTF-8 через NUL и смещения начала каждой строки
+    def add_strings(self):
+        encoded = [value.encode("utf-8") for value in self._strings if value is not None]
+        data = b"\0".join(encoded)
+        self.add("strings.offsets", "q", accumulate((len(value) + 1 for value in encoded), initial=0))
+        self.columns.append(("strings.data", "B", data))
+
+    def write(self, f):
+        position = _HEADER.size + _ENTRY.size * len(self.columns)
+        entries = []
+        for name, typecode, values in self.columns:
+            position = -(-position // _ALIGN) * _ALIGN
+            entries.append((name, typecode, len(values), position))
+            position += len(values) * _itemsize(typecode)
+
+        f.write(_HEADER.pack(MAGIC, VERSION, len(self.columns)))
+        for name, typecode, count, offset in entries:
+            f.write(_ENTRY.pack(name.encode("ascii"), typecode.encode("ascii"), count, offset))
+        written = _HEADER.size + _ENTRY.size * len(self.columns)
+        for (name, typecode, values), (_, _, _, offset) in zip(self.columns, entries):
+            f.write(b"\0" * (offset - written))
+            if isinstance(values, array) and sys.byteorder != "little":
+                values = array(typecode, values)
+                values.byteswap()
+            f.write(values)
+            written = offset + len(values) * _itemsize(typecode)
+
+
+# Чтение снимка из bytes или mmap. Столбцы не копируются: column() возвращает
+# memoryview на данные файла. verify=True - проверить контрольную сумму всего
+# файла (MappedSnapshot её не проверяет, чтобы не читать файл целиком)
+class SnapshotReader:
+    def __init__(self, buffer, verify: bool = False):
+        self._buffer = memoryview(buffer)
+        self._columns = {}
+        try:
+            self._read_directory(verify)
+        except Exception:
+            self.release()
+            raise
+
+    def _read_directory(self, verify: bool):
+        if len(self._buffer) < _HEADER.size:
+            raise EducationException("Файл не является снимком системы")
+        magic, version, count = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise EducationException("Файл не является снимком системы")
+        if version != VERSION:
+            raise EducationException(f"Неподдерживаемая версия снимка: {version}")
+
+        ## данные заканчиваются перед контрольной суммой
+        end = len(self._buffer) - _CHECKSUM_SIZE
+        if end < _HEADER.size + count * _ENTRY.size:
+            raise EducationException("Снимок системы повреждён (файл обрезан)")
+        if verify and hashlib.sha256(self._buffer[:end]).digest() != self._buffer[end:]:
+            raise EducationException("Снимок системы повреждён (контрольная сумма не совпадает)")
+
+        self._directory = {}
+        for i in range(count):
+            name, typecode, length, offset = _ENTRY.unpack_from(self._buffer, _HEADER.size + i * _ENTRY.size)
+            try:
+                typecode = typecode.decode("ascii")
+                size = _itemsize(typecode)
+                name = name.rstrip(b"\0").decode("ascii")
+            except ValueError:
+                raise EducationException("Снимок системы повреждён") from None
+            if offset + length * size > end:
+                raise EducationException("Снимок системы повреждён")
+            self._directory[name] = (typecode, length, offset)
+
+        self._string_offsets = self.column("strings.offsets")
+        self._string_data = self.column("strings.data")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._directory
+
+    def column(self, name: str):
+        column = self._columns.get(name)
+        if column is not None:
+            return column
+        try:
+            typecode, length, offset = self._directory[name]
+        except KeyError:
+            raise EducationException(f"В снимке нет столбца {name}") from None
+        data = self._buffer[offset:offset + length * _itemsize(typecode)]
+        if sys.byteorder != "little" and typecode != "B":
+            values = array(typecode, data)
+            values.byteswap()
+            column = memoryview(values)
+        else:
+            column = data.cast(typecode)
+        self._columns[name] = column
+        return column
+
+    # освободить буфер (после этого mmap можно закрыть)
+    def release(self):
+        for column in self._columns.values():
+            column.release()
+        self._columns.clear()
+        self._buffer.release()
+
+    # одна строка по номеру (для чтения без загрузки всей таблицы)
+    def string(self, string_id: int):
+        if string_id == NONE:
+            return None
+        start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1] - 1
+        return str(self._string_data[start:end], "utf-8")
+
+    # вся таблица строк
+    def strings(self) -> List[str]:
+        count = len(self._string_offsets) - 1
+        if count == 0:
+            return []
+        strings = str(self._string_data, "utf-8").split("\0")
+        if len(strings) != count:
+            # в самих строках встречается NUL - читаем по смещениям
+            strings = [self.string(i) for i in range(count)]
+        return strings
+
+
+def _itemsize(typecode: str) -> int:
+    return array(typecode).itemsize
+
+
+# Сохранить систему в снимок (файл заменяется атомарно, в конце - контрольная сумма)
+def save_snapshot(system: EducationSystem, filename: str):
+    sections = system._export_sections()
+    questions = [question for test in system.tests for question in test.questions]
+    ids = {}
+    for key, items in sections:
+        for position, item in enumerate(items):
+            ids[item] = position
+    for position, question in enumerate(questions):
+        ids[question] = position
+
+    writer = _SnapshotWriter()
+    writer.add("system.info", "q", writer.string_ids([system.created_date.isoformat()]) + [system._journal_seq])
+    for key, items in sections:
+        writer.add_section(key, items, ids)
+    writer.add_section("questions", questions, ids)
+    writer.add_strings()
+
+    with _atomic_file(filename) as raw:
+        checksum = _ChecksumWriter(raw)
+        writer.write(checksum)
+        raw.write(checksum.digest.digest())
+
+
+# классы объектов секций
+_CLASSES = {
+    "students": Student, "tutors": Tutor, "courses": Course, "lessons": Lesson, "homeworks": Homework,
+    "tests": Test, "questions": Question, "submissions": HomeworkSubmission, "payments": Payment,
+    "schedules": Schedule,
+}
+
+# порядок создания объектов: ссылки указывают только на уже созданные секции
+_LOAD_ORDER = ("tutors", "students", "courses", "lessons", "homeworks", "questions", "tests", "submissions",
+               "payments", "schedules")
+
+
+# Создать объекты cls без вызова __init__ (данные снимка уже проверялись
+# конструкторами при создании объектов) и заполнить атрибуты по столбцам
+def _restore(cls, fields: Dict[str, List]) -> List:
+    count = len(next(iter(fields.values())))
+    new = cls.__new__
+    items = [new(cls) for _ in range(count)]
+    for attr, values in fields.items():
+        for item, value in zip(items, values):
+            setattr(item, attr, value)
+    return items
+
+
+# Загрузить систему из снимка (текущие данные системы заменяются)
+def load_snapshot(system: EducationSystem, filename: str):
+    with open(filename, "rb") as f:
+        reader = SnapshotReader(f.read(), verify=True)
+    strings = reader.strings()
+
+    def texts(name: str) -> List:
+        return [strings[i] if i != NONE else None for i in reader.column(name)]
+
+    def items_of(name: str, items: List) -> List:
+        return [items[i] if i != NONE else None for i in reader.column(name)]
+
+    sections = {"strings": strings}
+    for key in _LOAD_ORDER:
+        fields = {}
+        for attr, kind in COLUMNS[key]:
+            name = f"{key}.{attr}"
+            if kind in "st":
+                fields[attr] = texts(name)
+            elif kind in _CODECS:
+                ## одинаковые даты и время - один объект на все элементы секции
+                numbers = reader.column(name).tolist()
+                decode = _CODECS[kind][1]
+                values = {number: decode(number) for number in set(numbers)}
+                fields[attr] = [values[number] for number in numbers]
+            else:
+                fields[attr] = reader.column(name).tolist()
+        for attr, target in REFERENCES.get(key, ()):
+            fields[attr] = items_of(f"{key}.{attr}", sections[target])
+        sections[key] = _restore(_CLASSES[key], fields)
+
+    # связи-списки: элементы всех секций уже созданы
+    for key, relations in RELATIONS.items():
+        for attr, target in relations:
+            offsets = reader.column(f"{key}.{attr}.offsets").tolist()
+            positions = reader.column(f"{key}.{attr}").tolist()
+            targets = sections[target]
+            # пустые ленивые связи остаются None, как у новых объектов
+            empty = None if isinstance(getattr(_CLASSES[key], attr), _LazyRelation) else []
+            for item, start, end in zip(sections[key], offsets, offsets[1:]):
+                setattr(item, attr, [targets[i] for i in positions[start:end]] if start != end else empty)
+
+    # атрибуты, которые не хранятся в снимке или хранятся в другом виде
+    for role in ("student", "tutor"):
+        for person in sections[role + "s"]:
+            person.role = role
+            person._schedule = None
+    for homework in sections["homeworks"]:
+        homework._student_submissions = None
+    for schedule in sections["schedules"]:
+        schedule._index = None
+    for key, attr in OPTIONAL:
+        for item in sections[key]:
+            if getattr(item, attr) == NONE:
+                setattr(item, attr, None)
+    for payment in sections["payments"]:
+        if payment.payment_date is not None:
+            payment.payment_date = datetime.fromisoformat(payment.payment_date)
+
+    system._clear_data()
+    created_date, system._journal_seq = reader.column("system.info").tolist()
+    system.created_date = datetime.fromisoformat(strings[created_date])
+    for key, tag, label, deps in system._SECTIONS:
+        add = getattr(system, "add_" + ("submission" if key == "submissions" else tag))
+        for item in sections[key]:
+            add(item)
+
+
+# Снимок только для чтения через mmap. Процессы, открывшие один файл,
+# используют общую копию его страниц в кэше ОС; представления объектов
+# (StudentView, CourseView, ...) не хранят данных и читают поля при обращении
+class MappedSnapshot:
+    def __init__(self, filename: str):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise EducationException("Файл не является снимком системы") from None
+        try:
+            self._reader = SnapshotReader(self._mmap)
+        except Exception:
+            self._mmap.close()
+            raise
+
+        # секции: snapshot.students, snapshot.payments, ...
+        for key in COLUMNS:
+            setattr(self, key, SectionView(self, key))
+
+    @property
+    def created_date(self) -> datetime:
+        return datetime.fromisoformat(self._reader.string(self._reader.column("system.info")[0]))
+
+    @property
+    def journal_seq(self) -> int:
+        return self._reader.column("system.info")[1]
+
+    # Закрыть снимок. Столбцы, полученные через SectionView.column, к этому
+    # моменту не должны использоваться
+    def close(self):
+        if self._reader is not None:
+            self._reader.release()
+            self._reader = None
+            self._mmap.close()
+
+    def __enter__(self) -> 'MappedSnapshot':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# Последовательность представлений объектов одной секции снимка
+class SectionView:
+    def __init__(self, snapshot: MappedSnapshot, key: str):
+        self._snapshot = snapshot
+        self.key = key
+        self._view = _VIEWS[key]
+        attr = COLUMNS[key][0][0] if COLUMNS[key] else REFERENCES[key][0][0]
+        self._length = len(snapshot._reader.column(f"{key}.{attr}"))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> 'EntityView':
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"Нет объекта с номером {index} в секции {self.key}")
+        return self._view(self._snapshot, index)
+
+    def __iter__(self):
+        view, snapshot = self._view, self._snapshot
+        return (view(snapshot, index) for index in range(self._length))
+
+    # Столбец атрибута целиком (memoryview) - для подсчётов по всей секции без
+    # создания представлений, например sum(snapshot.payments.column("total_amount")).
+    # Для строк и ссылок столбец содержит номера строк и позиции объектов
+    def column(self, attr: str):
+        return self._snapshot._reader.column(f"{self.key}.{attr}")
+
+
+# Представление объекта снимка: номер объекта в секции, поля читаются при обращении
+class EntityView:
+    __slots__ = ("_snapshot", "_index")
+    key = None
+
+    def __init__(self, snapshot: MappedSnapshot, index: int):
+        self._snapshot = snapshot
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    def __eq__(self, other) -> bool:
+        return (type(other) is type(self) and other._snapshot is self._snapshot
+                and other._index == self._index)
+
+    def __hash__(self) -> int:
+        return hash((self.key, self._index))
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self._index}>"
+
+
+class _PersonView(EntityView):
+    __slots__ = ()
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+
+# поле-столбец: строка, дата или число
+class _ColumnField:
+    def __init__(self, key: str, attr: str, kind: str):
+        self.name = f"{key}.{attr}"
+        self.kind = kind
+        self.optional = (key, attr) in OPTIONAL
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        reader = view._snapshot._reader
+        value = reader.column(self.name)[view._index]
+        if self.kind == "s":
+            return reader.string(value)
+        if self.kind == "t":
+            value = reader.string(value)
+            return datetime.fromisoformat(value) if value is not None else None
+        if self.kind in _CODECS:
+            return _CODECS[self.kind][1](value)
+        if self.optional and value == NONE:
+            return None
+        return value
+
+
+# ссылка на объект другой секции
+class _ReferenceField:
+    def __init__(self, key: str, attr: str, target: str):
+        self.name = f"{key}.{attr}"
+        self.target = target
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        snapshot = view._snapshot
+        position = snapshot._reader.column(self.name)[view._index]
+        return getattr(snapshot, self.target)[position] if position != NONE else None
+
+
+# связь-список: список представлений (или строк)
+class _RelationField:
+    def __init__(self, key: str, attr: str, target: str):
+        self.name = f"{key}.{attr}"
+        self.target = target
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        snapshot = view._snapshot
+        reader = snapshot._reader
+        offsets = reader.column(self.name + ".offsets")
+        positions = reader.column(self.name)[offsets[view._index]:offsets[view._index + 1]]
+        if self.target == "strings":
+            return [reader.string(position) for position in positions]
+        section = getattr(snapshot, self.target)
+        return [section[position] for position in positions]
+
+
+def _view_class(name: str, key: str, base=EntityView):
+    namespace = {"__slots__": (), "key": key}
+    for attr, kind in COLUMNS[key]:
+        namespace[attr] = _ColumnField(key, attr, kind)
+    for attr, target in REFERENCES.get(key, ()):
+        namespace[attr] = _ReferenceField(key, attr, target)
+    for attr, target in RELATIONS.get(key, ()):
+        namespace[attr] = _RelationField(key, attr, target)
+    return type(name, (base,), namespace)
+
+
+StudentView = _view_class("StudentView", "students", _PersonView)
+TutorView = _view_class("TutorView", "tutors", _PersonView)
+CourseView = _view_class("CourseView", "courses")
+LessonView = _view_class("LessonView", "lessons")
+HomeworkView = _view_class("HomeworkView", "homeworks")
+TestView = _view_class("TestView", "tests")
+QuestionView = _view_class("QuestionView", "questions")
+HomeworkSubmissionView = _view_class("HomeworkSubmissionView", "submissions")
+PaymentView = _view_class("PaymentView", "payments")
+ScheduleView = _view_class("ScheduleView", "schedules")
+
+_VIEWS = {view.key: view for view in (StudentView, TutorView, CourseView, LessonView, HomeworkView, TestView,
+                                      QuestionView, HomeworkSubmissionView, PaymentView, ScheduleView)}
@@ -0,0 +1,307 @@
+# Хранилища данных для EducationSystem.
+# Хранилище умеет сохранить систему целиком и загрузить её обратно;
+# SQLiteStorage загружает записи сущностей сразу, а связи между ними
+# (Course.students, Lesson.homeworks, Student.enrolled_courses и т.д.) - при
+# первом обращении к ним
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from functools import partial
+from typing import List
+
+from Online_edu import (Course, EducationSystem, Homework, HomeworkSubmission, Lesson, Payment,
+                        Question, Schedule, Student, Test, Tutor, _defer, _format_time)
+
+
+# Базовый класс хранилища
+class StorageBackend(ABC):
+
+    # сохранить всю систему
+    @abstractmethod
+    def save(self, system: EducationSystem):
+        pass
+
+    # загрузить систему (текущие данные системы заменяются)
+    @abstractmethod
+    def load(self, system: EducationSystem):
+        pass
+
+    def close(self):
+        pass
+
+
+# Хранилище в базе SQLite. Ключ записи (position) - позиция объекта в списке
+# системы, по нему записи ссылаются друг на друга (tutor_id, course_id, ...
+# и таблицы связей); в колонке id хранится id объекта, который присвоила
+# система (EducationSystem._register_id), и при загрузке он восстанавливается.
+# Порядок элементов связей хранится в колонке position таблиц связей
+class SQLiteStorage(StorageBackend):
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS system_info (key TEXT PRIMARY KEY, value TEXT);
+
+        CREATE TABLE IF NOT EXISTS students (
+            position INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT, age INTEGER, phone TEXT,
+            email TEXT, user_id INTEGER, grade INTEGER);
+        CREATE TABLE IF NOT EXISTS tutors (
+            position INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT, age INTEGER, phone TEXT,
+            email TEXT, user_id INTEGER, subject TEXT, experience INTEGER, bio TEXT);
+        CREATE TABLE IF NOT EXISTS courses (
+            position INTEGER PRIMARY KEY, name TEXT, tutor_id INTEGER, subject TEXT, description TEXT,
+            time TEXT, month_price TEXT, status TEXT, id INTEGER);
+        CREATE TABLE IF NOT EXISTS lessons (
+            position INTEGER PRIMARY KEY, name TEXT, description TEXT, course_id INTEGER,
+            start_time TEXT, end_time TEXT, date TEXT, id INTEGER);
+        CREATE TABLE IF NOT EXISTS homeworks (
+            position INTEGER PRIMARY KEY, title TEXT, description TEXT, lesson_id INTEGER,
+            deadline TEXT, max_score INTEGER, attachments TEXT, id INTEGER);
+        CREATE TABLE IF NOT EXISTS tests (position INTEGER PRIMARY KEY, title TEXT, lesson_id INTEGER, id INTEGER);
+        CREATE TABLE IF NOT EXISTS questions (
+            owner_id INTEGER, position INTEGER, text TEXT, options TEXT, correct_answer INTEGER,
+            PRIMARY KEY (owner_id, position)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS submissions (
+            position INTEGER PRIMARY KEY, student_id INTEGER, homework_id INTEGER, answer TEXT,
+            submitted_date TEXT, score INTEGER, feedback TEXT, id INTEGER);
+        CREATE TABLE IF NOT EXISTS payments (
+            position INTEGER PRIMARY KEY, student_id INTEGER, month TEXT, year INTEGER,
+            total_amount REAL, status TEXT, payment_date TEXT, id INTEGER);
+        CREATE TABLE IF NOT EXISTS schedules (
+            position INTEGER PRIMARY KEY, student_id INTEGER, tutor_id INTEGER, id INTEGER);
+
+        CREATE INDEX IF NOT EXISTS students_user_id ON students (user_id);
+        CREATE INDEX IF NOT EXISTS students_name ON students (first_name, last_name);
+        CREATE INDEX IF NOT EXISTS tutors_user_id ON tutors (user_id);
+        CREATE INDEX IF NOT EXISTS tutors_name ON tutors (first_name, last_name);
+        CREATE INDEX IF NOT EXISTS courses_name ON courses (name);
+        CREATE INDEX IF NOT EXISTS lessons_name ON lessons (name);
+        CREATE INDEX IF NOT EXISTS homeworks_title ON homeworks (title);
+        CREATE INDEX IF NOT EXISTS submissions_student ON submissions (student_id);
+        CREATE INDEX IF NOT EXISTS payments_student ON payments (student_id);
+    """
+
+    # таблицы связей: имя таблицы -> (класс владельца, атрибут связи)
+    _LINK_TABLES = {
+        "student_courses": (Student, "enrolled_courses"),
+        "tutor_courses": (Tutor, "courses_taught"),
+        "course_students": (Course, "students"),
+        "course_lessons": (Course, "lesson"),
+        "lesson_homeworks": (Lesson, "homeworks"),
+        "payment_courses": (Payment, "courses"),
+        "schedule_lessons": (Schedule, "lessons"),
+    }
+
+    # таблицы секций, в которых хранится id объекта
+    _ID_TABLES = EducationSystem._ID_SECTIONS
+
+    # колонки строк, которые пишет save
+    _COLUMNS = {
+        "system_info": ("key", "value"),
+        "students": ("position", "first_name", "last_name", "age", "phone", "email", "user_id", "grade"),
+        "tutors": ("position", "first_name", "last_name", "age", "phone", "email", "user_id",
+                   "subject", "experience", "bio"),
+        "courses": ("position", "id", "name", "tutor_id", "subject", "description", "time", "month_price",
+                    "status"),
+        "lessons": ("position", "id", "name", "description", "course_id", "start_time", "end_time", "date"),
+        "homeworks": ("position", "id", "title", "description", "lesson_id", "deadline", "max_score",
+                      "attachments"),
+        "tests": ("position", "id", "title", "lesson_id"),
+        "questions": ("owner_id", "position", "text", "options", "correct_answer"),
+        "submissions": ("position", "id", "student_id", "homework_id", "answer", "submitted_date", "score",
+                        "feedback"),
+        "payments": ("position", "id", "student_id", "month", "year", "total_amount", "status", "payment_date"),
+        "schedules": ("position", "id", "student_id", "tutor_id"),
+    }
+    _LINK_COLUMNS = ("owner_id", "position", "target_id")
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        # связи подгружаются из разных потоков, поэтому доступ к соединению под блокировкой
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._lock = threading.Lock()
+        try:
+            with self._lock, self._connection:
+                self._connection.executescript(self._SCHEMA)
+                for table in self._LINK_TABLES:
+                    self._connection.execute(
+                        f"CREATE TABLE IF NOT EXISTS {table} (owner_id INTEGER, position INTEGER, target_id INTEGER, "
+                        f"PRIMARY KEY (owner_id, position)) WITHOUT ROWID")
+                self._upgrade_schema()
+        except Exception:
+            self._connection.close()
+            raise
+
+    # Базы прежних версий: ключ записи назывался id, а id объектов не хранились.
+    # Ключ переименовывается в position, колонка id добавляется пустой (при
+    # загрузке таких записей система присваивает id заново)
+    def _upgrade_schema(self):
+        for key, tag, label, deps in EducationSystem._SECTIONS:
+            columns = {row[1] for row in self._connection.execute(f"PRAGMA table_info({key})")}
+            if "position" not in columns:
+                self._connection.execute(f"ALTER TABLE {key} RENAME COLUMN id TO position")
+                columns = (columns - {"id"}) | {"position"}
+            if key in self._ID_TABLES and "id" not in columns:
+                self._connection.execute(f"ALTER TABLE {key} ADD COLUMN id INTEGER")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def save(self, system: EducationSystem):
+        ids = {}
+        for key, items in system._export_sections():
+            for position, item in enumerate(items):
+                ids[item] = position
+
+        # Все строки собираются до очистки таблиц: обращение к связям может
+        # подгружать их из этой же базы. Колонки строк - _COLUMNS
+        rows = {
+            "students": [(ids[s], s.first_name, s.last_name, s.age, s.phone, s.email, s.user_id, s.grade)
+                         for s in system.students],
+            "tutors": [(ids[t], t.first_name, t.last_name, t.age, t.phone, t.email, t.user_id,
+                        t.subject, t.experience, t.bio) for t in system.tutors],
+            "courses": [(ids[c], c.id, c.name, ids.get(c.tutor), c.subject, c.description, c.time, c.month_price,
+                         c.status) for c in system.courses],
+            "lessons": [(ids[l], l.id, l.name, l.description, ids.get(l.course), _format_time(l.start_time),
+                         _format_time(l.end_time), l.date.isoformat()) for l in system.lessons],
+            "homeworks": [(ids[h], h.id, h.title, h.description, ids.get(h.lesson), h.deadline.isoformat(),
+                           h.max_score, json.dumps(h.attachments, ensure_ascii=False)) for h in system.homeworks],
+            "tests": [(ids[t], t.id, t.title, ids.get(t.lesson)) for t in system.tests],
+            "questions": [(ids[t], position, q.text, json.dumps(q.options, ensure_ascii=False), q.correct_answer)
+                          for t in system.tests for position, q in enumerate(t.questions)],
+            "submissions": [(ids[s], s.id, ids.get(s.student), ids.get(s.homework), s.answer,
+                             s.submitted_date.isoformat(), s.score, s.feedback) for s in system.submissions],
+            "payments": [(ids[p], p.id, ids.get(p.student), p.month, p.year, p.total_amount, p.status,
+                          p.payment_date.isoformat() if p.payment_date else None) for p in system.payments],
+            "schedules": [(ids[s], s.id, ids.get(s.student), ids.get(s.tutor)) for s in system.schedules],
+        }
+        for table, (cls, attr) in self._LINK_TABLES.items():
+            owners = self._owners(system, cls)
+            rows[table] = [(ids[owner], position, ids[target])
+                           for owner in owners
+                           for position, target in enumerate(getattr(owner, attr))
+                           if target in ids]
+        rows["system_info"] = [("created_date", system.created_date.isoformat()),
+                               ("journal_seq", str(system._journal_seq))]
+
+        with self._lock, self._connection:
+            for table, table_rows in rows.items():
+                self._connection.execute(f"DELETE FROM {table}")
+                if table_rows:
+                    columns = self._COLUMNS.get(table, self._LINK_COLUMNS)
+                    placeholders = ", ".join("?" * len(columns))
+                    self._connection.executemany(
+                        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", table_rows)
+
+    def load(self, system: EducationSystem):
+        system._clear_data()
+        info = dict(self._query("SELECT key, value FROM system_info"))
+        if "created_date" in info:
+            system.created_date = datetime.fromisoformat(info["created_date"])
+        system._journal_seq = int(info.get("journal_seq", 0))
+
+        for row in self._query("SELECT first_name, last_name, age, phone, email, user_id, grade "
+                               "FROM students ORDER BY position"):
+            system.add_student(Student(*row))
+        for row in self._query("SELECT first_name, last_name, age, phone, email, user_id, subject, experience, bio "
+                               "FROM tutors ORDER BY position"):
+            system.add_tutor(Tutor(*row))
+
+        # снимки списков: отложенные загрузчики не должны зависеть от последующих изменений системы
+        students, tutors = list(system.students), list(system.tutors)
+        for course_id, name, tutor_id, subject, description, time, month_price, status in self._query(
+                "SELECT id, name, tutor_id, subject, description, time, month_price, status "
+                "FROM courses ORDER BY position"):
+            course = Course(name, tutors[tutor_id], subject, description, time, month_price, status)
+            course.id = course_id
+            system.add_course(course)
+        courses = list(system.courses)
+
+        for lesson_id, name, description, course_id, start_time, end_time, date in self._query(
+                "SELECT id, name, description, course_id, start_time, end_time, date FROM lessons ORDER BY position"):
+            lesson = Lesson(name, description, courses[course_id], start_time, end_time, date)
+            lesson.id = lesson_id
+            system.add_lesson(lesson)
+        lessons = list(system.lessons)
+
+        for homework_id, title, description, lesson_id, deadline, max_score, attachments in self._query(
+                "SELECT id, title, description, lesson_id, deadline, max_score, attachments "
+                "FROM homeworks ORDER BY position"):
+            homework = Homework(title, description, lessons[lesson_id], deadline, max_score)
+            homework.id = homework_id
+            homework.attachments = json.loads(attachments)
+            system.add_homework(homework)
+        homeworks = list(system.homeworks)
+
+        for position, test_id, title, lesson_id in self._query(
+                "SELECT position, id, title, lesson_id FROM tests ORDER BY position"):
+            test = Test(title, lessons[lesson_id])
+            test.id = test_id
+            _defer(test, "questions", partial(self._load_questions, position))
+            system.add_test(test)
+
+        for submission_id, student_id, homework_id, answer, submitted_date, score, feedback in self._query(
+                "SELECT id, student_id, homework_id, answer, submitted_date, score, feedback "
+                "FROM submissions ORDER BY position"):
+            submission = HomeworkSubmission(students[student_id], homeworks[homework_id], answer, submitted_date)
+            submission.id = submission_id
+            submission.score = score
+            submission.feedback = feedback
+            system.add_submission(submission)
+
+        for payment_id, student_id, month, year, total_amount, status, payment_date in self._query(
+                "SELECT id, student_id, month, year, total_amount, status, payment_date "
+                "FROM payments ORDER BY position"):
+            payment = Payment(students[student_id], month, year)
+            payment.id = payment_id
+            payment.total_amount = total_amount
+            payment.status = status
+            payment.payment_date = datetime.fromisoformat(payment_date) if payment_date else None
+            system.add_payment(payment)
+
+        for schedule_id, student_id, tutor_id in self._query(
+                "SELECT id, student_id, tutor_id FROM schedules ORDER BY position"):
+            schedule = Schedule(student=students[student_id] if student_id is not None else None,
+                                tutor=tutors[tutor_id] if tutor_id is not None else None)
+            schedule.id = schedule_id
+            system.add_schedule(schedule)
+
+        # Связи не читаются сейчас, а подгружаются при первом обращении
+        link_targets = {
+            "student_courses": courses, "tutor_courses": courses, "course_students": students,
+            "course_lessons": lessons, "lesson_homeworks": homeworks, "payment_courses": courses,
+            "schedule_lessons": lessons,
+        }
+        for table, (cls, attr) in self._LINK_TABLES.items():
+            for owner_id, owner in enumerate(self._owners(system, cls)):
+                _defer(owner, attr, partial(self._load_links, table, owner_id, link_targets[table]))
+
+        # Выручку по курсам и репетиторам считаем по курсам оплаченных платежей
+        # одним запросом: при добавлении платежей их курсы ещё не подгружены
+        payments = system.payments
+        paid_courses = {}
+        for owner_id, target_id in self._query("SELECT owner_id, target_id FROM payment_courses "
+                                               "ORDER BY owner_id, position"):
+            if payments[owner_id].status == "paid":
+                paid_courses.setdefault(owner_id, []).append(courses[target_id])
+        for owner_id, payment_courses in paid_courses.items():
+            system.revenue.record_courses(payments[owner_id].total_amount, payment_courses)
+
+    @staticmethod
+    def _owners(system: EducationSystem, cls) -> List:
+        return {Student: system.students, Tutor: system.tutors, Course: system.courses, Lesson: system.lessons,
+                Payment: system.payments, Schedule: system.schedules}[cls]
+
+    def _query(self, sql: str, params=()) -> List:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    # загрузить связь: объекты targets в порядке position
+    def _load_links(self, table: str, owner_id: int, targets: List) -> List:
+        rows = self._query(f"SELECT target_id FROM {table} WHERE owner_id = ? ORDER BY position", (owner_id,))
+        return [targets[target_id] for target_id, in rows]
+
+    def _load_questions(self, position: int) -> List[Question]:
+        rows = self._query("SELECT text, options, correct_answer FROM questions WHERE owner_id = ? "
+                           "ORDER BY position", (position,))
+        return [Question(text, json.loads(options), correct_answer) for text, options, correct_answer in rows]
@@ -0,0 +1,162 @@
+# Общие помощники тестов: случайные системы, id с пропусками и сравнение
+# состояния систем после сохранения и загрузки
+import random
+from datetime import timedelta
+
+from Online_edu import (Course, EducationSystem, Homework, HomeworkSubmission, Lesson, OrderedSet, Payment,
+                        Question, Schedule, Student, Test, Tutor)
+
+# форматы сохранения: расширение файла, метод записи, метод загрузки
+ROUND_TRIP_FORMATS = (
+    ("json", "save_to_json", "load_from_json"),
+    ("xml", "save_to_xml", "load_from_xml"),
+    ("snap", "save_snapshot", "load_snapshot"),
+    ("db", "save_to_sqlite", "load_from_sqlite"),
+)
+
+
+# Случайная система для проверки сохранения и загрузки: повторяющиеся имена,
+# пустые строки и спецсимволы XML в текстах, уроки и задания вне списков
+# курса/урока, расписания длиннее пяти уроков, платежи во всех статусах
+_NAMES = ("Иван", "Анна", "Пётр", "Мария", "Olga")
+_TEXTS = ("Описание", "", "a < b & c > d", "кавычки \"x\" и 'y'", "строка\nвторая", "  пробелы  ", "эмодзи 🎓")
+
+
+def random_system(seed: int, n_students: int) -> EducationSystem:
+    rng = random.Random(seed)
+    system = EducationSystem()
+    tutors = []
+    for i in range(max(2, n_students // 20)):
+        tutor = Tutor(rng.choice(_NAMES), rng.choice(_NAMES), rng.randint(20, 70), "89161234567",
+                      f"tutor{i}@edu.ru", i + 1, rng.choice(("Математика", "Физика")), rng.randint(0, 30),
+                      rng.choice(_TEXTS))
+        system.add_tutor(tutor)
+        tutors.append(tutor)
+
+    students = []
+    for i in range(n_students):
+        student = Student(rng.choice(_NAMES), rng.choice(_NAMES), rng.randint(7, 60), "89161112233",
+                          f"student{i}@edu.ru", len(tutors) + i + 1, rng.randint(1, 11))
+        system.add_student(student)
+        students.append(student)
+
+    courses = []
+    for i in range(max(2, n_students // 10)):
+        course = Course(f"Курс {rng.randrange(len(tutors))}", rng.choice(tutors), "Математика",
+                        rng.choice(_TEXTS), "18:00", rng.choice(("5000 руб", "4 500,50 руб", "100")),
+                        rng.choice(("active", "closed")))
+        if rng.random() < 0.9:
+            course.tutor.courses_taught.append(course)
+        system.add_course(course)
+        courses.append(course)
+    for student in students:
+        for course in rng.sample(courses, rng.randint(0, min(3, len(courses)))):
+            student.enrolled_courses.append(course)
+            course.students.append(student)
+
+    lessons = []
+    for i in range(max(1, n_students // 2)):
+        course = rng.choice(courses)
+        hour = rng.randint(8, 20)
+        lesson = Lesson(f"Урок {rng.randrange(len(courses))}", rng.choice(_TEXTS), course, f"{hour:02d}:00",
+                        f"{hour:02d}:45", f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        if rng.random() < 0.9:
+            course.lesson.append(lesson)
+        system.add_lesson(lesson)
+        lessons.append(lesson)
+
+    homeworks = []
+    for i in range(max(1, n_students // 4)):
+        lesson = rng.choice(lessons)
+        homework = Homework(f"Задание {rng.randrange(len(lessons))}", rng.choice(_TEXTS), lesson,
+                            lesson.date + timedelta(days=7), rng.randint(1, 100))
+        for _ in range(rng.randint(0, 2)):
+            homework.attachments.append(rng.choice(("a.pdf", "<b>.docx", "")))
+        if rng.random() < 0.9:
+            lesson.homeworks.append(homework)
+        system.add_homework(homework)
+        homeworks.append(homework)
+
+    for i in range(max(1, n_students // 10)):
+        test = Test(f"Тест {i % 7}", rng.choice(lessons))
+        for number in range(rng.randint(0, 4)):
+            options = [rng.choice(_TEXTS) for _ in range(rng.randint(2, 4))]
+            test.add_question(Question(f"Вопрос {number}", options, rng.randrange(len(options))))
+        system.add_test(test)
+
+    for i in range(n_students // 2):
+        homework = rng.choice(homeworks)
+        submission = HomeworkSubmission(rng.choice(students), homework, "ответ " * rng.randint(1, 30),
+                                        homework.deadline + timedelta(days=rng.randint(-5, 2)))
+        if rng.random() < 0.7:
+            submission.set_score(rng.randint(0, homework.max_score))
+        if rng.random() < 0.5:
+            submission.feedback = rng.choice(_TEXTS)
+        system.add_submission(submission)
+
+    for student in rng.sample(students, n_students // 3):
+        payment = Payment(student, rng.choice(("январь", "февраль")), rng.choice((2023, 2024)))
+        for course in student.enrolled_courses:
+            payment.add_course(course)
+        if payment.courses and rng.random() < 0.6:
+            payment.process_payment()
+        elif rng.random() < 0.2:
+            payment.status = "cancelled"
+        system.add_payment(payment)
+
+    for owner in rng.sample(students, n_students // 5) + rng.sample(tutors, len(tutors) // 2):
+        if isinstance(owner, Student):
+            schedule = Schedule(student=owner, tutor=None)
+        else:
+            schedule = Schedule(student=None, tutor=owner)
+        for lesson in rng.sample(lessons, min(len(lessons), rng.randint(0, 12))):
+            schedule.add_lesson(lesson, check_conflicts=False)
+        system.add_schedule(schedule)
+    return system
+
+
+# id с пропусками и не по порядку добавления, как после удаления объектов и
+# загрузки файлов: сохранение и загрузка не должны их перенумеровывать
+def scatter_ids(system: EducationSystem) -> EducationSystem:
+    for key in system._ID_SECTIONS:
+        items = getattr(system, key)
+        index = getattr(system, f"_{key}_by_id")
+        index.clear()
+        for number, item in enumerate(reversed(items)):
+            item.id = number * 7 + 3
+            index[item.id] = item
+        system._last_ids[key] = max(index, default=0)
+    return system
+
+
+# Состояние системы для сравнения после загрузки: все поля объектов (слоты
+# классов, ленивые связи - через свойства), связанные объекты - класс и id.
+# Не сравниваются кэши (_price, _index), личное расписание человека и
+# student_submissions - они не сохраняются
+_STATE_SKIP = {"_price", "_index", "_schedule", "_student_submissions"}
+
+
+def _state_value(value):
+    if isinstance(value, (Student, Tutor)):
+        return type(value).__name__, value.user_id
+    if isinstance(value, Question):
+        return value.text, tuple(value.options), value.correct_answer
+    if isinstance(value, (Course, Lesson, Homework, Test, HomeworkSubmission, Payment, Schedule)):
+        return type(value).__name__, value.id
+    if isinstance(value, (list, OrderedSet)):
+        return tuple(_state_value(item) for item in value)
+    return value
+
+
+def system_state(system: EducationSystem) -> dict:
+    state = {}
+    for key, items in system._export_sections():
+        slots = [slot for cls in type(items[0]).__mro__ for slot in getattr(cls, "__slots__", ())
+                 if slot not in _STATE_SKIP] if items else []
+        state[key] = [tuple(_state_value(getattr(item, slot.lstrip("_"))) for slot in slots) for item in items]
+    state["system_info"] = (system.created_date, system._journal_seq)
+    revenue = system.revenue
+    state["revenue"] = (revenue.by_month, revenue.total,
+                        {_state_value(course): amount for course, amount in revenue.by_course.items()},
+                        {_state_value(tutor): amount for tutor, amount in revenue.by_tutor.items()})
+    return state
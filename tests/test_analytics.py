@@ -0,0 +1,181 @@
+# Аналитика оценок и проверка бланков пачкой: результаты GradeAnalytics и
+# TestGrader совпадают с методами каждой работы (get_score_percentage/
+# get_grade_letter) и Test.calculate_score - с NumPy и без него
+import random
+
+import pytest
+
+import edu_analytics
+from edu_analytics import GradeAnalytics, np
+from helpers import random_system
+import Online_edu
+from Online_edu import EducationException, HomeworkSubmission, Question
+
+USE_NUMPY = [False, pytest.param(True, marks=pytest.mark.skipif(np is None, reason="NumPy не установлен"))]
+
+
+# Работы случайной системы и работы с баллами на границах оценок
+# (ровно 50/70/90% и чуть ниже) и без оценки
+@pytest.fixture
+def submissions():
+    system = random_system(5, 60)
+    submissions = list(system.submissions)
+    homework = system.homeworks[0]
+    for share in (None, 0, 0.4999, 0.5, 0.6999, 0.7, 0.8999, 0.9, 1, None):
+        submission = HomeworkSubmission(system.students[0], homework, "ответ", "2024-03-01")
+        submission.score = share * homework.max_score if share is not None else None
+        submissions.append(submission)
+    return submissions
+
+
+# средний процент оценённых работ по группам key, посчитанный по каждой работе
+def _expected_averages(submissions, key) -> dict:
+    groups = {}
+    for submission in submissions:
+        if submission.score is not None:
+            groups.setdefault(key(submission), []).append(submission.get_score_percentage())
+    return {group: sum(values) / len(values) for group, values in groups.items()}
+
+
+def _assert_averages(actual: dict, expected: dict):
+    assert actual == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+def test_letters_and_distribution_match_per_object(submissions, use_numpy):
+    analytics = GradeAnalytics(submissions, use_numpy=use_numpy)
+    letters = [submission.get_grade_letter() for submission in submissions]
+    assert len(analytics) == len(submissions)
+    assert analytics.letters() == letters
+    assert list(analytics.percentages) == pytest.approx([s.get_score_percentage() for s in submissions])
+    assert analytics.distribution() == {letter: letters.count(letter) for letter in ("5", "4", "3", "2")}
+    assert list(analytics.distribution()) == ["5", "4", "3", "2"]
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+def test_averages_match_per_object(submissions, use_numpy):
+    analytics = GradeAnalytics(submissions, use_numpy=use_numpy)
+    graded = [s.get_score_percentage() for s in submissions if s.score is not None]
+    assert analytics.average() == pytest.approx(sum(graded) / len(graded))
+    _assert_averages(analytics.average_by_student(), _expected_averages(submissions, lambda s: s.student))
+    _assert_averages(analytics.average_by_homework(), _expected_averages(submissions, lambda s: s.homework))
+    _assert_averages(analytics.average_by_course(),
+                     _expected_averages(submissions, lambda s: s.homework.lesson.course))
+    _assert_averages(analytics.average_by(lambda s: s.submitted_date.month),
+                     _expected_averages(submissions, lambda s: s.submitted_date.month))
+
+
+# без работ и без оценённых работ: пустые средние, нулевое распределение
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+def test_no_graded_submissions(submissions, use_numpy):
+    empty = GradeAnalytics([], use_numpy=use_numpy)
+    assert empty.letters() == [] and empty.average() == 0.0 and empty.average_by_course() == {}
+    assert empty.distribution() == {"5": 0, "4": 0, "3": 0, "2": 0}
+
+    ungraded = [submission for submission in submissions if submission.score is None]
+    analytics = GradeAnalytics(ungraded, use_numpy=use_numpy)
+    assert analytics.letters() == ["2"] * len(ungraded)
+    assert analytics.average() == 0.0
+    assert analytics.average_by_student() == {} and analytics.average_by_homework() == {}
+
+
+# тест из вопросов с разным числом вариантов; классы Test и TestGrader
+# берутся через модули, иначе pytest принимает их за наборы тестов
+@pytest.fixture
+def test():
+    system = random_system(5, 10)
+    test = Online_edu.Test("Итоговый тест", system.lessons[0])
+    for i, options in enumerate((2, 4, 3, 5, 4)):
+        test.add_question(Question(f"Вопрос {i}", [f"вариант {j}" for j in range(options)], i % options))
+    return test
+
+
+# Случайные бланки: ответы в пределах вариантов и вне их (-1 - нет ответа,
+# номер больше последнего варианта)
+def _sheets(test, count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    return [[rng.randint(-1, len(question.options)) for question in test.questions] for _ in range(count)]
+
+
+# статистика по вопросам, посчитанная по каждому ответу
+def _expected_option_counts(test, sheets) -> list:
+    counts = [[0] * len(question.options) for question in test.questions]
+    for sheet in sheets:
+        for question_counts, answer in zip(counts, sheet):
+            if 0 <= answer < len(question_counts):
+                question_counts[answer] += 1
+    return counts
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+def test_grade_matches_calculate_score(test, use_numpy):
+    grader = edu_analytics.TestGrader(test, use_numpy=use_numpy)
+    sheets = _sheets(test, 500)
+    expected = [test.calculate_score(sheet) for sheet in sheets]
+    assert list(grader.grade(sheets)) == expected
+    # пачка из итератора и пустая пачка
+    assert list(grader.grade(iter(sheets))) == expected
+    assert list(grader.grade([])) == []
+    assert list(test.calculate_scores(sheets)) == expected
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+def test_grade_stream_and_file_match_calculate_score(tmp_path, test, use_numpy):
+    grader = edu_analytics.TestGrader(test, use_numpy=use_numpy)
+    sheets = _sheets(test, 250)
+    expected = [test.calculate_score(sheet) for sheet in sheets]
+
+    chunks = [list(chunk) for chunk in grader.grade_stream(iter(sheets), chunk_size=64)]
+    assert [len(chunk) for chunk in chunks] == [64, 64, 64, 58]
+    assert sum(chunks, []) == expected
+
+    filename = tmp_path / "answers.csv"
+    filename.write_text("\n".join(",".join(map(str, sheet)) for sheet in sheets) + "\n", encoding="utf-8")
+    assert sum((list(chunk) for chunk in grader.grade_file(str(filename), chunk_size=100)), []) == expected
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+def test_wrong_sheet_length_raises(test, use_numpy):
+    grader = edu_analytics.TestGrader(test, use_numpy=use_numpy)
+    sheets = _sheets(test, 10)
+    sheets[3] = sheets[3][:-1]
+    with pytest.raises(EducationException):
+        test.calculate_score(sheets[3])
+    with pytest.raises(EducationException):
+        grader.grade(sheets)
+    with pytest.raises(EducationException):
+        list(grader.grade_stream(sheets, chunk_size=4))
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+@pytest.mark.parametrize("line", ["0,1,2", "0,1,2,3,4,5", "0,1,x,3,4", "0;1;2;3;4"],
+                         ids=["short", "long", "not-a-number", "wrong-separator"])
+def test_bad_answer_file_line_raises(tmp_path, test, use_numpy, line):
+    filename = tmp_path / "answers.csv"
+    filename.write_text(f"0,1,2,3,4\n{line}\n", encoding="utf-8")
+    with pytest.raises(EducationException):
+        list(edu_analytics.TestGrader(test, use_numpy=use_numpy).grade_file(str(filename)))
+
+
+# ответы вне списка вариантов не попадают в статистику; статистика потока
+# порциями та же, что у одной пачки
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+def test_question_statistics(test, use_numpy):
+    grader = edu_analytics.TestGrader(test, use_numpy=use_numpy)
+    sheets = _sheets(test, 300)
+    stats = grader.statistics()
+    grader.grade(sheets, stats)
+
+    expected = _expected_option_counts(test, sheets)
+    assert stats.sheets == len(sheets)
+    assert stats.option_counts == expected
+    correct = [sum(sheet[i] == question.correct_answer for sheet in sheets)
+               for i, question in enumerate(test.questions)]
+    assert stats.correct == correct
+    assert stats.difficulty() == pytest.approx([count / len(sheets) for count in correct])
+
+    streamed = grader.statistics()
+    for _ in grader.grade_stream(sheets, chunk_size=7, stats=streamed):
+        pass
+    assert (streamed.sheets, streamed.option_counts) == (stats.sheets, stats.option_counts)
+    assert grader.statistics().difficulty() == [0.0] * len(test.questions)
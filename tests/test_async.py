@@ -0,0 +1,94 @@
+# Асинхронный интерфейс: запись без fork и по снимку на момент вызова,
+# загрузка с заменой данных на месте
+import asyncio
+import os
+import threading
+
+import pytest
+
+from helpers import random_system, system_state
+import Online_edu
+from Online_edu import Course, EducationSystem, Question
+
+
+def test_asave_writes_same_file_without_fork(tmp_path, monkeypatch):
+    system = random_system(0, 40)
+    expected, actual = str(tmp_path / "sync.json"), str(tmp_path / "async.json")
+    system.save_to_json(expected)
+
+    def no_fork():
+        raise AssertionError("asave_json не должен вызывать fork")
+
+    monkeypatch.setattr(os, "fork", no_fork, raising=False)
+    asyncio.run(system.asave_json(actual))
+    with open(expected, "rb") as f, open(actual, "rb") as g:
+        assert f.read() == g.read()
+
+
+def test_aload_updates_lists_and_indexes_in_place(tmp_path):
+    source = random_system(1, 40)
+    filename = str(tmp_path / "system.xml")
+    source.save_to_xml(filename)
+
+    system = EducationSystem(thread_safe=True)
+    students, by_id, revenue = system.students, system._students_by_id, system.revenue
+    asyncio.run(system.aload_xml(filename))
+
+    assert system.students is students and system._students_by_id is by_id and system.revenue is revenue
+    assert system_state(system) == system_state(source)
+    student = source.students[0]
+    assert system.find_student(student.user_id).full_name == student.full_name
+    assert system._student_refs.get(student.user_id) is system.find_student(student.user_id)
+
+
+# Система меняется, пока поток исполнителя пишет файл: в файл попадает
+# состояние на момент вызова (тот же файл, что синхронная запись до
+# изменений), курсы и студенты в нём ссылаются друг на друга согласованно
+@pytest.mark.parametrize("ext, save, asave, load", [("json", "save_to_json", "asave_json", "load_from_json"),
+                                                    ("xml", "save_to_xml", "asave_xml", "load_from_xml")])
+def test_changes_during_asave_are_not_written(tmp_path, monkeypatch, ext, save, asave, load):
+    system = random_system(2, 40)
+    expected, actual = str(tmp_path / f"sync.{ext}"), str(tmp_path / f"async.{ext}")
+    getattr(system, save)(expected)
+
+    # запись останавливается на первой части секции, пока не изменим систему
+    started, resume = threading.Event(), threading.Event()
+    export_chunk = Online_edu._export_chunk
+
+    def paused_export_chunk(*args):
+        started.set()
+        assert resume.wait(10)
+        return export_chunk(*args)
+
+    monkeypatch.setattr(Online_edu, "_export_chunk", paused_export_chunk)
+
+    def change():
+        course = system.courses[0]
+        for student in system.students:
+            if course in student.enrolled_courses:
+                student.enrolled_courses.remove(course)
+                course.students.remove(student)
+            else:
+                system.enroll(student, course)
+            student.first_name = "Изменён"
+        system.lessons[0].name = "Другой урок"
+        system.tests[0].add_question(Question("Новый вопрос", ["да", "нет"], 0))
+        system.add_course(Course("Новый курс", system.tutors[0], "Физика", "", "10:00", "100", "active"))
+
+    async def save_while_changing():
+        task = asyncio.ensure_future(getattr(system, asave)(actual))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 10)
+        change()
+        resume.set()
+        await task
+
+    asyncio.run(save_while_changing())
+    with open(expected, "rb") as f, open(actual, "rb") as g:
+        assert f.read() == g.read()
+
+    loaded = EducationSystem()
+    getattr(loaded, load)(actual)
+    for course in loaded.courses:
+        assert all(course in student.enrolled_courses for student in course.students)
+    for student in loaded.students:
+        assert all(student in course.students for course in student.enrolled_courses)
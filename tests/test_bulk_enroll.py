@@ -0,0 +1,44 @@
+# Запись на курсы пакетом: тот же результат, что у цикла choose_a_course,
+# отчёт по каждой паре в исходном порядке
+import gc
+import random
+
+from helpers import random_system
+from Online_edu import EnrollmentException
+
+
+# Пары по номерам студентов и курсов: случайные (с повторами и уже
+# записанными студентами), повтор пары и пары с ошибкой - None вместо студента или курса
+def _pairs(system, indexes) -> list:
+    return [(system.students[i] if i is not None else "студент", system.courses[j] if j is not None else "курс")
+            for i, j in indexes]
+
+
+def test_bulk_enroll_matches_loop():
+    bulk, loop = random_system(8, 60), random_system(8, 60)
+    rng = random.Random(8)
+    indexes = [(rng.randrange(len(bulk.students)), rng.randrange(len(bulk.courses))) for _ in range(400)]
+    indexes += [(0, 0), (None, 0), (1, None), (0, 0)]
+
+    expected = []
+    for student, course in _pairs(loop, indexes):
+        if isinstance(student, str):
+            expected.append("error")
+            continue
+        try:
+            student.choose_a_course(course)
+            expected.append("enrolled")
+        except EnrollmentException:
+            expected.append("already_enrolled" if course in student.enrolled_courses else "error")
+
+    pairs = _pairs(bulk, indexes)
+    report = bulk.bulk_enroll(pairs)
+    assert [result["status"] for result in report] == expected
+    assert [(result["student"], result["course"]) for result in report] == pairs
+    assert all(result["error"] for result in report if result["status"] == "error")
+    for ours, theirs in zip(bulk.courses, loop.courses):
+        assert [student.user_id for student in ours.students] == [student.user_id for student in theirs.students]
+    for ours, theirs in zip(bulk.students, loop.students):
+        assert {course.id for course in ours.enrolled_courses} == {course.id for course in theirs.enrolled_courses}
+    # сборщик мусора пакет не отключает
+    assert gc.isenabled()
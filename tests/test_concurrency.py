@@ -0,0 +1,119 @@
+# Потокобезопасный режим: параллельные записи на курсы и платежи без
+# потерянных обновлений. Без блокировок те же сценарии теряют обновления -
+# это показывает, что тесты действительно создают гонку
+import random
+import sys
+import threading
+
+import pytest
+
+from Online_edu import Course, EducationSystem, EnrollmentException, Payment, PaymentException, Student, Tutor
+
+
+# Платёж, проверка статуса которого ждёт второй поток: process_payment
+# читает status перед "status == 'paid'", и пока платёж не проведён, чтение
+# ждёт у барьера, чтобы оба потока прошли проверку одновременно. Если
+# второй поток не пришёл (его держит блокировка платежа), ожидание
+# прерывается по тайм-ауту и поток продолжает один
+class _RacyPayment(Payment):
+    barrier = None
+
+    @property
+    def status(self):
+        status = self._status
+        if status == "pending" and self.barrier is not None:
+            try:
+                self.barrier.wait()
+            except threading.BrokenBarrierError:
+                pass
+        return status
+
+    @status.setter
+    def status(self, value):
+        self._status = value
+
+
+def _run_threads(count: int, work):
+    threads = [threading.Thread(target=work, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _tutor() -> Tutor:
+    return Tutor("Иван", "Петров", 35, "89161234567", "ivan@edu.ru", 1, "Математика", 5, "")
+
+
+def _payments(system: EducationSystem, count: int) -> list:
+    course = Course("Алгебра", _tutor(), "Математика", "", "18:00", "5000 руб", "active")
+    payments = []
+    for i in range(count):
+        student = Student("Анна", "Смирнова", 15, "89161112233", f"s{i}@edu.ru", i + 2, 9)
+        payment = _RacyPayment(student, "январь", 2024)
+        payment.add_course(course)
+        system.add_payment(payment)
+        payment.barrier = threading.Barrier(2, timeout=0.1)
+        payments.append(payment)
+    return payments
+
+
+@pytest.mark.parametrize("thread_safe", [True, False], ids=["locked", "unlocked"])
+def test_concurrent_payment_is_processed_once(thread_safe):
+    system = EducationSystem(thread_safe=thread_safe)
+    payments = _payments(system, 10)
+    processed = [0, 0]
+
+    def work(index):
+        for payment in payments:
+            try:
+                system.process_payment(payment)
+                processed[index] += 1
+            except PaymentException:
+                pass
+
+    _run_threads(2, work)
+    expected = sum(payment.total_amount for payment in payments)
+    if thread_safe:
+        assert sum(processed) == len(payments)
+        assert system.revenue.total == expected
+    else:
+        # оба потока прошли проверку статуса: платёж учтён в выручке дважды
+        assert sum(processed) == 2 * len(payments)
+        assert system.revenue.total == 2 * expected
+
+
+# Много потоков записывают студентов на курсы; пары повторяются, в том числе
+# у разных потоков. Каждая уникальная пара записывается ровно один раз и
+# видна с обеих сторон связи
+def test_concurrent_enrollment_keeps_both_sides(fast_switching):
+    system = EducationSystem(thread_safe=True)
+    tutor = _tutor()
+    courses = [Course(f"Курс {i}", tutor, "Математика", "", "18:00", "5000 руб", "active") for i in range(20)]
+    students = [Student("Анна", "Смирнова", 15, "89161112233", f"s{i}@edu.ru", i + 2, 9) for i in range(300)]
+    rng = random.Random(1)
+    pairs = [(rng.choice(students), rng.choice(courses)) for _ in range(6000)]
+    threads = 16
+    enrolled = [0] * threads
+
+    def work(index):
+        for student, course in pairs[index::threads] + pairs[(index + 1) % threads::threads]:
+            try:
+                system.enroll(student, course)
+                enrolled[index] += 1
+            except EnrollmentException:
+                pass
+
+    _run_threads(threads, work)
+    unique = set(pairs)
+    assert sum(enrolled) == len(unique)
+    assert {(student, course) for course in courses for student in course.students} == unique
+    assert {(student, course) for student in students for course in student.enrolled_courses} == unique
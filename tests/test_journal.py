@@ -0,0 +1,113 @@
+# Журнал изменений: после сбоя recover (снимок + журнал) восстанавливает
+# систему в состоянии последней полностью записанной операции
+import random
+
+import pytest
+
+from helpers import random_system, system_state
+from Online_edu import Course, EducationSystem, Homework, HomeworkSubmission, Lesson, Payment, Student
+
+
+# Операции, которые попадают в журнал: добавления (в том числе связанных
+# объектов), запись на курс по одному и пакетом, проведение платежа, оценка
+def _changes(system: EducationSystem, seed: int):
+    rng = random.Random(seed)
+    user_id = max(student.user_id for student in system.students) + 1
+    student = Student("Новый", "Студент", 16, "89160000000", f"new{user_id}@edu.ru", user_id, 10)
+    system.add_student(student)
+    system.enroll(student, rng.choice([course for course in system.courses if student not in course.students]))
+
+    tutor = rng.choice(system.tutors)
+    course = Course(f"Курс {user_id}", tutor, tutor.subject, "", "18:00", "3000 руб", "active")
+    tutor.courses_taught.append(course)
+    student.enrolled_courses.append(course)
+    course.students.append(student)
+    system.add_course(course)
+
+    lesson = Lesson(f"Урок {user_id}", "", course, "10:00", "11:00", "2024-05-20")
+    course.lesson.append(lesson)
+    system.add_lesson(lesson)
+    homework = Homework(f"Задание {user_id}", "", lesson, "2024-05-27", 10)
+    lesson.homeworks.append(homework)
+    system.add_homework(homework)
+
+    submission = HomeworkSubmission(student, homework, "ответ", "2024-05-25")
+    system.add_submission(submission)
+    system.set_score(submission, 8, "хорошо")
+
+    payment = Payment(student, "май", 2024)
+    payment.add_course(course)
+    system.add_payment(payment)
+    system.process_payment(payment)
+
+    system.bulk_enroll([(rng.choice(system.students), rng.choice(system.courses)) for _ in range(20)])
+
+
+# Состояние системы после записи в JSON и загрузки. Порядок студентов курса
+# файлы не хранят (при загрузке он строится по порядку студентов), поэтому
+# восстановленная система сравнивается с исходной, прошедшей тот же путь
+def _saved_state(system: EducationSystem, tmp_path) -> dict:
+    filename = str(tmp_path / "state.json")
+    system.save_to_json(filename)
+    loaded = EducationSystem()
+    loaded.load_from_json(filename)
+    return system_state(loaded)
+
+
+def _last_enroll(system: EducationSystem):
+    student = system.students[-1]
+    system.enroll(student, next(course for course in system.courses if student not in course.students))
+
+
+# Сбой во время записи последней операции: журнал обрывается на середине
+# строки (запись отбрасывается) или перед переводом строки (запись полная и
+# применяется). Следующие операции дописываются в журнал с новой строки и
+# тоже восстанавливаются
+@pytest.mark.parametrize("cut, applied", [(1, True), (10, False)], ids=["newline", "half-record"])
+def test_recover_after_crash(tmp_path, cut, applied):
+    snapshot, journal = str(tmp_path / "snapshot.json"), str(tmp_path / "journal.jsonl")
+    system = random_system(6, 30)
+    system.open_journal(journal)
+    _changes(system, 1)
+    system.compact_journal(snapshot)
+    _changes(system, 2)
+    before = _saved_state(system, tmp_path)
+    _last_enroll(system)
+    system.close_journal()
+    expected = _saved_state(system, tmp_path) if applied else before
+
+    with open(journal, "rb+") as f:
+        f.truncate(f.seek(0, 2) - cut)
+
+    recovered = EducationSystem()
+    recovered.recover(snapshot, journal)
+    assert _saved_state(recovered, tmp_path) == expected
+
+    _last_enroll(recovered)
+    recovered.close_journal()
+    expected = _saved_state(recovered, tmp_path)
+    again = EducationSystem()
+    again.recover(snapshot, journal)
+    assert _saved_state(again, tmp_path) == expected
+    again.close_journal()
+
+
+# Сбой между записью снимка и очисткой журнала: записи, уже вошедшие в
+# снимок, при восстановлении не применяются повторно
+def test_recover_skips_records_in_snapshot(tmp_path):
+    snapshot, journal = str(tmp_path / "snapshot.json"), str(tmp_path / "journal.jsonl")
+    system = random_system(6, 30)
+    system.open_journal(journal)
+    _changes(system, 1)
+    with open(journal, encoding="utf-8") as f:
+        before_compaction = f.read()
+    system.compact_journal(snapshot)
+    system.close_journal()
+    expected = _saved_state(system, tmp_path)
+
+    with open(journal, "w", encoding="utf-8") as f:
+        f.write(before_compaction)
+    recovered = EducationSystem()
+    recovered.recover(snapshot, journal)
+    assert _saved_state(recovered, tmp_path) == expected
+    recovered.close_journal()
@@ -0,0 +1,62 @@
+# Потоковое чтение JSON: значения на границах буфера, обрезанный и
+# некорректный файл, число чтений для значения больше буфера
+import io
+import json
+
+import pytest
+
+from Online_edu import EducationException, _JsonStreamReader
+
+
+class _CountingFile(io.StringIO):
+    reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def _reader(text: str, chunk_size: int = 16) -> _JsonStreamReader:
+    return _JsonStreamReader(_CountingFile(text), chunk_size)
+
+
+def _read_all(reader: _JsonStreamReader) -> dict:
+    result = {}
+    for key in reader.iter_keys():
+        result[key] = list(reader.iter_array()) if reader.is_array() else reader.read_value()
+    return result
+
+
+# маленький буфер: ключи, строки и числа разрезаются между чтениями
+def test_values_across_chunk_boundaries():
+    data = {"info": {"version": 2, "ratio": 22.5}, "items": [{"name": "Анна", "score": 1e-3}, 12345678901, True, None],
+            "empty": [], "text": "x" * 100}
+    assert _read_all(_reader(json.dumps(data, indent=2, ensure_ascii=False), chunk_size=3)) == data
+
+
+# Значение больше буфера (например, отложенная секция) читается за
+# логарифмическое число чтений; обрезанное значение дочитывается до конца
+# файла так же быстро и даёт EducationException
+@pytest.mark.parametrize("truncated", [False, True], ids=["complete", "truncated"])
+def test_large_value_reads_grow_geometrically(truncated):
+    value = {"items": ["x" * 50 for _ in range(20000)]}
+    text = json.dumps(value)
+    reader = _reader(text[:-2] if truncated else text)
+    if truncated:
+        with pytest.raises(EducationException):
+            reader.read_value()
+    else:
+        assert reader.read_value() == value
+    assert reader._f.reads < 40
+
+
+@pytest.mark.parametrize("text", [
+    '{"items": [' + ", ".join(['"' + "x" * 50 + '"'] * 20000),
+    '{"items": {"a": 1, ' + '"b": [1, 2' * 100,
+    '{"items": [1, 2,, 3]}',
+    '{"items" 1}',
+    '',
+], ids=["truncated-array", "truncated-nested", "extra-comma", "missing-colon", "empty"])
+def test_malformed_json_raises(text):
+    with pytest.raises(EducationException):
+        _read_all(_reader(text))
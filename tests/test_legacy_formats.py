@@ -0,0 +1,72 @@
+# Загрузка файлов, записанных прежними версиями: даты и время там хранились
+# произвольным текстом, а связи - по именам
+import json
+import os
+from datetime import date, time
+
+import pytest
+
+from Online_edu import EducationException, EducationSystem, Lesson
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# education_system.json прежней версии с уроком start_time и date в старом виде
+def _legacy_json(tmp_path, start_time: str, lesson_date: str) -> str:
+    with open(os.path.join(ROOT, "education_system.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    data["lessons"][0].update(start_time=start_time, date=lesson_date)
+    filename = str(tmp_path / "legacy.json")
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return filename
+
+
+def test_json_with_unpadded_time_loads(tmp_path):
+    system = EducationSystem()
+    system.load_from_json(_legacy_json(tmp_path, "9:00", "2024-01-15"))
+    lesson = system.lessons[0]
+    assert lesson.start_time == time(9, 0)
+    assert lesson.time_range == "09:00-19:30"
+
+
+def test_json_with_dotted_date_loads(tmp_path):
+    system = EducationSystem()
+    system.load_from_json(_legacy_json(tmp_path, "9.00", "15.01.2024"))
+    assert system.lessons[0].date == date(2024, 1, 15)
+    assert system.lessons[0].start_time == time(9, 0)
+
+
+def test_xml_with_unpadded_time_loads(tmp_path):
+    with open(os.path.join(ROOT, "education_system.xml"), encoding="utf-8") as f:
+        text = f.read()
+    filename = tmp_path / "legacy.xml"
+    filename.write_text(text.replace("<start_time>18:00</start_time>", "<start_time>9:00</start_time>"),
+                        encoding="utf-8")
+    system = EducationSystem()
+    system.load_from_xml(str(filename))
+    assert system.lessons[0].start_time == time(9, 0)
+
+
+def test_normalized_file_is_saved_in_iso(tmp_path):
+    system = EducationSystem()
+    system.load_from_json(_legacy_json(tmp_path, "9:00", "15/01/2024"))
+    filename = str(tmp_path / "saved.json")
+    system.save_to_json(filename)
+    with open(filename, encoding="utf-8") as f:
+        lesson = json.load(f)["lessons"][0]
+    assert (lesson["start_time"], lesson["date"]) == ("09:00", "2024-01-15")
+
+
+def test_unreadable_time_is_rejected(tmp_path):
+    with pytest.raises(EducationException):
+        EducationSystem().load_from_json(_legacy_json(tmp_path, "утром", "2024-01-15"))
+
+
+def test_constructor_stays_strict():
+    system = EducationSystem()
+    system.load_from_json(os.path.join(ROOT, "education_system.json"))
+    with pytest.raises(EducationException):
+        Lesson("Урок", "", system.courses[0], "9:00", "10:00", "2024-01-15")
+    with pytest.raises(EducationException):
+        Lesson("Урок", "", system.courses[0], "09:00", "10:00", "15.01.2024")
@@ -0,0 +1,63 @@
+# Параллельная запись JSON и XML (workers > 1): файл байт в байт тот же, что
+# при записи в одном процессе. Порог parallel_min снижен, а os.cpu_count
+# подменён, чтобы части небольшой системы действительно сериализовали
+# дочерние процессы на машине с любым числом ядер
+import multiprocessing
+import os
+
+import pytest
+
+from edu_generator import generate_system
+from helpers import random_system, scatter_ids
+from Online_edu import EducationSystem
+
+pytestmark = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                                reason="параллельная запись использует fork")
+
+SYSTEMS = {
+    "empty": EducationSystem,
+    "random-gapped-ids": lambda: scatter_ids(random_system(3, 40)),
+    "generated": lambda: generate_system(80, seed=3),
+}
+
+FORMATS = [
+    ("json", lambda system, filename, **kwargs: system.save_to_json(filename, **kwargs)),
+    ("xml", lambda system, filename, **kwargs: system.save_to_xml(filename, **kwargs)),
+    ("xml-compact", lambda system, filename, **kwargs: system.save_to_xml(filename, indent=False, **kwargs)),
+]
+
+
+# число вызовов параллельной сериализации
+@pytest.fixture
+def parallel_calls(monkeypatch):
+    calls = []
+    parallel = EducationSystem._export_fragments_parallel
+
+    def spy(self, sections, fmt, indent, workers, context):
+        calls.append(workers)
+        yield from parallel(self, sections, fmt, indent, workers, context)
+
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(EducationSystem, "_export_fragments_parallel", spy)
+    return calls
+
+
+@pytest.mark.parametrize("name", SYSTEMS)
+@pytest.mark.parametrize("ext, save", FORMATS, ids=[ext for ext, _ in FORMATS])
+def test_parallel_export_matches_serial(tmp_path, parallel_calls, name, ext, save):
+    system = SYSTEMS[name]()
+    serial, parallel = tmp_path / f"serial.{ext}", tmp_path / f"parallel.{ext}"
+    save(system, str(serial))
+    assert parallel_calls == []
+
+    save(system, str(parallel), workers=2, parallel_min=0)
+    assert parallel_calls == [2]
+    assert parallel.read_bytes() == serial.read_bytes()
+
+
+# ниже порога и с одним процессом записи части сериализуются в этом процессе
+def test_small_system_is_exported_serially(tmp_path, parallel_calls):
+    system = random_system(3, 40)
+    system.save_to_json(str(tmp_path / "default.json"), workers=2)
+    system.save_to_json(str(tmp_path / "one.json"), workers=1, parallel_min=0)
+    assert parallel_calls == []
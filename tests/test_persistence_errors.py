@@ -0,0 +1,105 @@
+# Ошибки сохранения и загрузки снимка, хранилища и файлов JSON/XML:
+# EducationException, а неудачная загрузка не стирает данные системы
+import json
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from helpers import random_system, system_state
+from Online_edu import EducationException, EducationSystem
+
+
+@pytest.fixture
+def system():
+    return random_system(2, 30)
+
+
+@pytest.fixture
+def snapshot(tmp_path, system):
+    filename = str(tmp_path / "system.snap")
+    system.save_snapshot(filename)
+    return filename
+
+
+# загрузка в систему с данными: при ошибке данные должны остаться прежними
+def _assert_load_fails_and_keeps_state(target: EducationSystem, load, *args):
+    before = system_state(target)
+    with pytest.raises(EducationException):
+        load(*args)
+    assert system_state(target) == before
+
+
+def test_truncated_snapshot_raises(tmp_path, system, snapshot):
+    with open(snapshot, "rb") as f:
+        data = f.read()
+    for size in (10, len(data) // 2, len(data) - 1):
+        truncated = tmp_path / f"truncated{size}.snap"
+        truncated.write_bytes(data[:size])
+        _assert_load_fails_and_keeps_state(system, system.load_snapshot, str(truncated))
+
+
+def test_corrupt_snapshot_raises(tmp_path, system, snapshot):
+    data = bytearray(open(snapshot, "rb").read())
+    data[len(data) // 2] ^= 0xFF
+    corrupt = tmp_path / "corrupt.snap"
+    corrupt.write_bytes(bytes(data))
+    _assert_load_fails_and_keeps_state(system, system.load_snapshot, str(corrupt))
+
+
+def test_missing_snapshot_raises(tmp_path, system):
+    _assert_load_fails_and_keeps_state(system, system.load_snapshot, str(tmp_path / "missing.snap"))
+
+
+def test_snapshot_save_error_raises(tmp_path, system):
+    with pytest.raises(EducationException):
+        system.save_snapshot(str(tmp_path / "missing_dir" / "system.snap"))
+
+
+def test_bad_sqlite_path_raises(tmp_path, system):
+    bad_path = str(tmp_path / "missing_dir" / "system.db")
+    with pytest.raises(EducationException):
+        system.save_to_sqlite(bad_path)
+    _assert_load_fails_and_keeps_state(system, system.load_from_sqlite, bad_path)
+
+
+def test_corrupt_sqlite_file_raises(tmp_path, system):
+    filename = tmp_path / "garbage.db"
+    filename.write_bytes(b"not a database" * 100)
+    _assert_load_fails_and_keeps_state(system, system.load_from_sqlite, str(filename))
+
+
+def test_failed_storage_load_keeps_state(tmp_path, system):
+    filename = str(tmp_path / "system.db")
+    system.save_to_sqlite(filename)
+    import sqlite3
+    with sqlite3.connect(filename) as connection:
+        connection.execute("UPDATE courses SET tutor_id = 10000")
+    _assert_load_fails_and_keeps_state(system, system.load_from_sqlite, filename)
+
+
+# Файл без версии и контрольной суммы (прежний формат) проходит проверку
+# целостности; ошибка обнаруживается только на неверной ссылке в последней
+# секции, когда остальные секции уже прочитаны
+def test_failed_json_load_keeps_state(tmp_path, system):
+    filename = str(tmp_path / "system.json")
+    system.save_to_json(filename)
+    with open(filename, encoding="utf-8") as f:
+        data = json.load(f)
+    del data["checksum"], data["system_info"]["format_version"]
+    data["schedules"][0]["person_id"] = 10000
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    _assert_load_fails_and_keeps_state(system, system.load_from_json, filename)
+
+
+def test_failed_xml_load_keeps_state(tmp_path, system):
+    filename = str(tmp_path / "system.xml")
+    system.save_to_xml(filename)
+    # комментарий с контрольной суммой парсер отбрасывает
+    root = ET.parse(filename).getroot()
+    info = root.find("system_info")
+    info.remove(info.find("format_version"))
+    root.find("schedules/schedule/owner/id").text = "10000"
+    ET.ElementTree(root).write(filename, encoding="utf-8")
+    _assert_load_fails_and_keeps_state(system, system.load_from_xml, filename)
@@ -0,0 +1,76 @@
+# Выручка RevenueLedger: суммы по курсам и репетиторам сходятся с суммами по месяцам
+import pytest
+
+from Online_edu import EducationSystem, Payment, Student, Tutor
+
+
+def _system():
+    system = EducationSystem()
+    tutors = [Tutor("Иван", "Петров", 35, "89161234567", "ivan@tutor.com", 1, "Математика", 5, ""),
+              Tutor("Мария", "Смирнова", 40, "89161234568", "maria@tutor.com", 2, "Физика", 10, "")]
+    student = Student("Анна", "Иванова", 16, "89161112233", "anna@mail.ru", 3, 10)
+    for tutor in tutors:
+        system.add_tutor(tutor)
+    system.add_student(student)
+    courses = [tutors[0].create_course("Алгебра", "Математика", "", "18:00", "5000 руб", "active"),
+               tutors[1].create_course("Механика", "Физика", "", "19:00", "3 000,50 руб", "active")]
+    for course in courses:
+        system.add_course(course)
+    payment = Payment(student, "январь", 2024)
+    for course in courses:
+        payment.add_course(course)
+    system.add_payment(payment)
+    return system, payment, courses
+
+
+def _assert_totals_agree(revenue):
+    assert sum(revenue.by_course.values()) == pytest.approx(revenue.total)
+    assert sum(revenue.by_tutor.values()) == pytest.approx(revenue.total)
+    assert sum(revenue.by_month.values()) == pytest.approx(revenue.total)
+
+
+def test_price_change_after_payment_keeps_totals():
+    system, payment, courses = _system()
+    system.process_payment(payment)
+    courses[0].month_price = "9000 руб"
+
+    second = Payment(system.students[0], "февраль", 2024)
+    for course in courses:
+        second.add_course(course)
+    system.add_payment(second)
+    system.process_payment(second)
+
+    revenue = system.revenue
+    assert revenue.month(2024, "январь") == pytest.approx(8000.5)
+    assert revenue.month(2024, "февраль") == pytest.approx(12000.5)
+    _assert_totals_agree(revenue)
+
+
+def test_price_change_before_processing_splits_stored_total():
+    system, payment, courses = _system()
+    courses[1].month_price = "6001 руб"
+    system.process_payment(payment)
+
+    revenue = system.revenue
+    assert revenue.month(2024, "январь") == pytest.approx(payment.total_amount)
+    _assert_totals_agree(revenue)
+
+
+@pytest.mark.parametrize("save, load", [("save_to_json", "load_from_json"), ("save_to_xml", "load_from_xml"),
+                                        ("save_snapshot", "load_snapshot"), ("save_to_sqlite", "load_from_sqlite")])
+def test_loaded_payment_with_changed_prices_keeps_totals(tmp_path, save, load):
+    system, payment, courses = _system()
+    system.process_payment(payment)
+    filename = str(tmp_path / "system")
+    getattr(system, save)(filename)
+
+    loaded = EducationSystem()
+    getattr(loaded, load)(filename)
+    loaded.courses[0].month_price = "100 руб"
+    reloaded = EducationSystem()
+    getattr(loaded, save)(filename + ".2")
+    getattr(reloaded, load)(filename + ".2")
+
+    for revenue in (loaded.revenue, reloaded.revenue):
+        assert revenue.total == pytest.approx(8000.5)
+        _assert_totals_agree(revenue)
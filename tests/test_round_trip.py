@@ -0,0 +1,147 @@
+# Сохранение и загрузка без потерь: после load(save(x)) система совпадает с x
+# во всех форматах - JSON, XML, двоичный снимок и SQLite - на подобранных
+# крайних случаях и на множестве случайных систем разного размера
+import random
+
+import pytest
+
+from edu_generator import generate_system
+from helpers import ROUND_TRIP_FORMATS, random_system, scatter_ids, system_state
+import Online_edu
+from Online_edu import (Course, EducationSystem, Homework, HomeworkSubmission, Lesson, Payment, Question, Schedule,
+                        Student, Tutor)
+
+
+# Поля с символами вне ASCII и разметкой: кириллица, иероглифы, арабский,
+# комбинируемые знаки, символы вне BMP, спецсимволы XML, переводы строк
+def _unicode_system() -> EducationSystem:
+    system = EducationSystem()
+    tutor = Tutor("Zoë", "李", 40, "89161234567", "zoe@edu.ru", 1, "Математика", 12,
+                  "биография 🎓 <b>&amp;</b> \"кавычки\" 'одинарные'\nвторая строка\tтаб")
+    student = Student("Ñandú", "Ёлкина-Щукина", 17, "89161112233", "nandu@edu.ru", 2, 11)
+    other = Student("مريم", "Åström", 20, "89161112244", "mariam@edu.ru", 3, 9)
+    system.add_tutor(tutor)
+    system.add_student(student)
+    system.add_student(other)
+
+    course = Course("Курс 数学 ∑", tutor, "Математика", "é комбинируемые ‮справа налево‬ 𝔘𝔫𝔦", "18:00",
+                    "4 500,50 руб", "active")
+    tutor.courses_taught.append(course)
+    system.add_course(course)
+    for person in (student, other):
+        person.enrolled_courses.append(course)
+        course.students.append(person)
+
+    lesson = Lesson("Урок «первый» 🧮", "  пробелы по краям  ", course, "09:00", "09:45", "2024-03-08")
+    course.lesson.append(lesson)
+    system.add_lesson(lesson)
+
+    homework = Homework("Задание №1 ½", "x < y && y > z", lesson, "2024-03-15", 10)
+    homework.attachments.extend(["отчёт.pdf", "<script>.js", "", "名前.docx"])
+    lesson.homeworks.append(homework)
+    system.add_homework(homework)
+
+    # класс Test импортируется через модуль, иначе pytest принимает его за набор тестов
+    test = Online_edu.Test("Тест ✓", lesson)
+    test.add_question(Question("Сколько будет 2²?", ["4", "２", "четыре 🙂"], 0))
+    system.add_test(test)
+
+    submission = HomeworkSubmission(student, homework, "ответ: ∫x dx = x²/2\r\nконец", "2024-03-16")
+    submission.set_score(7)
+    submission.feedback = "Хорошо 👍, но поздно"
+    system.add_submission(submission)
+
+    payment = Payment(student, "март", 2024)
+    payment.add_course(course)
+    payment.process_payment()
+    system.add_payment(payment)
+
+    schedule = Schedule(student=other, tutor=None)
+    schedule.add_lesson(lesson)
+    system.add_schedule(schedule)
+    return system
+
+
+# Часть секций пустая: только репетиторы, студенты и курсы без уроков
+def _sparse_system() -> EducationSystem:
+    system = EducationSystem()
+    tutor = Tutor("Иван", "Петров", 35, "89161234567", "ivan@edu.ru", 1, "Физика", 5, "")
+    system.add_tutor(tutor)
+    system.add_student(Student("Анна", "Смирнова", 15, "89161112233", "anna@edu.ru", 2, 9))
+    system.add_course(Course("Механика", tutor, "Физика", "", "10:00", "100", "closed"))
+    return system
+
+
+def _assert_round_trip(tmp_path, source: EducationSystem, ext: str, save: str, load: str):
+    filename = str(tmp_path / f"system.{ext}")
+    getattr(source, save)(filename)
+
+    loaded = EducationSystem()
+    getattr(loaded, load)(filename)
+    expected, actual = system_state(source), system_state(loaded)
+    assert [key for key in expected if actual[key] != expected[key]] == []
+
+
+SYSTEMS = {
+    "empty": EducationSystem,
+    "sparse": _sparse_system,
+    "unicode": lambda: scatter_ids(_unicode_system()),
+    "random": lambda: random_system(1, 40),
+    "random-gapped-ids": lambda: scatter_ids(random_system(2, 40)),
+    "generated-gapped-ids": lambda: scatter_ids(generate_system(60, seed=5)),
+}
+
+
+@pytest.mark.parametrize("name", SYSTEMS)
+@pytest.mark.parametrize("ext, save, load", ROUND_TRIP_FORMATS, ids=[ext for ext, _, _ in ROUND_TRIP_FORMATS])
+def test_round_trip(tmp_path, name, ext, save, load):
+    _assert_round_trip(tmp_path, SYSTEMS[name](), ext, save, load)
+
+
+# Свойство load(save(x)) == x на множестве случайных систем: seed задаёт
+# генератор, число студентов (от пустой системы до сотен) и перенумерацию id
+SWEEP_SEEDS = range(40)
+SWEEP_SIZES = (0, 1, 2, 5, 13, 40, 150, 400)
+
+
+def _sweep_system(seed: int) -> EducationSystem:
+    rng = random.Random(seed)
+    size = rng.choice(SWEEP_SIZES)
+    if rng.random() < 0.5:
+        system = random_system(seed, size)
+    else:
+        system = generate_system(size, seed=seed)
+    return scatter_ids(system) if rng.random() < 0.5 else system
+
+
+@pytest.mark.parametrize("seed", SWEEP_SEEDS)
+@pytest.mark.parametrize("ext, save, load", ROUND_TRIP_FORMATS, ids=[ext for ext, _, _ in ROUND_TRIP_FORMATS])
+def test_round_trip_sweep(tmp_path, seed, ext, save, load):
+    _assert_round_trip(tmp_path, _sweep_system(seed), ext, save, load)
+
+
+# большие системы: тысячи студентов, десятки тысяч связей
+LARGE_SYSTEMS = {
+    "random-gapped-ids": lambda: scatter_ids(random_system(7, 3000)),
+    "generated": lambda: generate_system(5000, seed=7),
+}
+
+
+@pytest.mark.parametrize("name", LARGE_SYSTEMS)
+@pytest.mark.parametrize("ext, save, load", ROUND_TRIP_FORMATS, ids=[ext for ext, _, _ in ROUND_TRIP_FORMATS])
+def test_round_trip_large(tmp_path, name, ext, save, load):
+    _assert_round_trip(tmp_path, LARGE_SYSTEMS[name](), ext, save, load)
+
+
+# Новые объекты после загрузки получают id после наибольшего загруженного
+@pytest.mark.parametrize("ext, save, load", ROUND_TRIP_FORMATS, ids=[ext for ext, _, _ in ROUND_TRIP_FORMATS])
+def test_ids_continue_after_load(tmp_path, ext, save, load):
+    source = scatter_ids(random_system(3, 40))
+    filename = str(tmp_path / f"system.{ext}")
+    getattr(source, save)(filename)
+
+    loaded = EducationSystem()
+    getattr(loaded, load)(filename)
+    course = Course("Новый", loaded.tutors[0], "Математика", "", "18:00", "100", "active")
+    loaded.add_course(course)
+    assert course.id == max(item.id for item in source.courses) + 1
@@ -0,0 +1,62 @@
+# Индекс расписания: запросы по дате и промежутку дат, проверка пересечений
+# и перестроение индекса, когда у урока меняются дата или время
+import pytest
+
+from Online_edu import Course, Lesson, LessonException, Schedule, Tutor
+
+
+@pytest.fixture
+def course() -> Course:
+    tutor = Tutor("Иван", "Петров", 35, "89161234567", "ivan@edu.ru", 1, "Физика", 5, "")
+    return Course("Механика", tutor, "Физика", "", "10:00", "100", "active")
+
+
+@pytest.fixture
+def schedule(course) -> Schedule:
+    schedule = Schedule(student=None, tutor=course.tutor)
+    for name, start, end, day in (("Урок 1", "10:00", "11:00", "2024-03-01"),
+                                  ("Урок 2", "12:00", "13:00", "2024-03-01"),
+                                  ("Урок 3", "10:00", "11:00", "2024-03-05")):
+        schedule.add_lesson(Lesson(name, "", course, start, end, day))
+    return schedule
+
+
+def _names(lessons) -> list:
+    return [lesson.name for lesson in lessons]
+
+
+def test_queries_by_date(schedule):
+    assert _names(schedule.get_lessons_by_date("2024-03-01")) == ["Урок 1", "Урок 2"]
+    assert _names(schedule.get_lessons_between("2024-03-02", "2024-03-31")) == ["Урок 3"]
+    assert _names(schedule.get_upcoming_lessons()) == ["Урок 1", "Урок 2", "Урок 3"]
+
+
+def test_overlapping_lesson_is_rejected(schedule, course):
+    with pytest.raises(LessonException):
+        schedule.add_lesson(Lesson("Урок 4", "", course, "10:30", "11:30", "2024-03-01"))
+    # урок, который начинается в момент окончания другого, не пересекается с ним
+    schedule.add_lesson(Lesson("Урок 5", "", course, "11:00", "12:00", "2024-03-01"))
+    assert _names(schedule.get_lessons_by_date("2024-03-01")) == ["Урок 1", "Урок 5", "Урок 2"]
+
+
+def test_rescheduled_lesson_moves_in_index(schedule, course):
+    lesson = schedule.get_lessons_by_date("2024-03-05")[0]
+    lesson.date = "2024-03-01"
+    lesson.start_time = "14:00"
+    lesson.end_time = "15:00"
+    assert _names(schedule.get_lessons_by_date("2024-03-01")) == ["Урок 1", "Урок 2", "Урок 3"]
+    assert schedule.get_lessons_by_date("2024-03-05") == []
+
+    # пересечения ищутся по новому времени урока
+    assert schedule.find_conflicts(Lesson("Урок 4", "", course, "14:30", "15:30", "2024-03-01")) == [lesson]
+    with pytest.raises(LessonException):
+        schedule.add_lesson(Lesson("Урок 4", "", course, "14:30", "15:30", "2024-03-01"))
+    schedule.add_lesson(Lesson("Урок 6", "", course, "10:00", "11:00", "2024-03-05"))
+
+
+def test_cancel_rescheduled_lesson(schedule):
+    lesson = schedule.get_lessons_by_date("2024-03-01")[0]
+    schedule.get_upcoming_lessons()
+    lesson.date = "2024-04-01"
+    schedule.cancel_lesson(lesson.name)
+    assert _names(schedule.get_upcoming_lessons()) == ["Урок 2", "Урок 3"]
@@ -0,0 +1,54 @@
+# Хранилище SQLite: id объектов сохраняются и восстанавливаются, базы прежних
+# версий (без колонки id) загружаются
+import sqlite3
+
+from edu_storage import SQLiteStorage
+from helpers import random_system, scatter_ids, system_state
+from Online_edu import EducationSystem
+
+
+def _ids(system: EducationSystem) -> dict:
+    return {key: [item.id for item in getattr(system, key)] for key in system._ID_SECTIONS}
+
+
+def test_ids_survive_save_and_load(tmp_path):
+    system = scatter_ids(random_system(4, 30))
+    filename = str(tmp_path / "system.db")
+    system.save_to_sqlite(filename)
+
+    loaded = EducationSystem()
+    loaded.load_from_sqlite(filename)
+    assert _ids(loaded) == _ids(system)
+    assert system_state(loaded) == system_state(system)
+    # следующий id выдаётся после наибольшего загруженного
+    assert loaded._last_ids == system._last_ids
+
+
+def test_old_schema_is_upgraded(tmp_path):
+    filename = str(tmp_path / "old.db")
+    connection = sqlite3.connect(filename)
+    with connection:
+        connection.executescript("""
+            CREATE TABLE tutors (
+                id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT, age INTEGER, phone TEXT,
+                email TEXT, user_id INTEGER, subject TEXT, experience INTEGER, bio TEXT);
+            CREATE TABLE courses (
+                id INTEGER PRIMARY KEY, name TEXT, tutor_id INTEGER, subject TEXT, description TEXT,
+                time TEXT, month_price TEXT, status TEXT);
+            INSERT INTO tutors VALUES (0, 'Иван', 'Петров', 35, '+79001234567', 'ivan@mail.ru', 1,
+                                       'Математика', 10, '');
+            INSERT INTO courses VALUES (0, 'Алгебра', 0, 'Математика', '', 'Пн 10:00', '5000 руб', 'active');
+            INSERT INTO courses VALUES (1, 'Геометрия', 0, 'Математика', '', 'Ср 10:00', '5000 руб', 'active');
+        """)
+    connection.close()
+
+    storage = SQLiteStorage(filename)
+    try:
+        columns = [row[1] for row in storage._query("PRAGMA table_info(courses)")]
+        assert "position" in columns and "id" in columns
+        system = EducationSystem()
+        system.load_from_storage(storage)
+    finally:
+        storage.close()
+    # id в старой базе не хранились: система присваивает их заново
+    assert [(course.name, course.id) for course in system.courses] == [("Алгебра", 1), ("Геометрия", 2)]
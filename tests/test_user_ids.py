@@ -0,0 +1,57 @@
+# user_id студентов и репетиторов: по нему записываются связи, поэтому
+# второй человек того же вида с занятым user_id в систему не добавляется
+import json
+
+import pytest
+
+from helpers import random_system, system_state
+from Online_edu import EducationException, EducationSystem, Student, Tutor
+
+
+def _student(user_id: int, name: str = "Анна") -> Student:
+    return Student(name, "Смирнова", 15, "89161112233", "anna@edu.ru", user_id, 9)
+
+
+def _tutor(user_id: int, name: str = "Иван") -> Tutor:
+    return Tutor(name, "Петров", 35, "89161234567", "ivan@edu.ru", user_id, "Математика", 5, "")
+
+
+@pytest.mark.parametrize("make, add, key", [
+    (_student, "add_student", "students"),
+    (_tutor, "add_tutor", "tutors"),
+], ids=["student", "tutor"])
+def test_duplicate_user_id_raises(make, add, key):
+    system = EducationSystem()
+    first = make(7)
+    getattr(system, add)(first)
+    with pytest.raises(EducationException):
+        getattr(system, add)(make(7, "Мария"))
+    assert getattr(system, key) == [first]
+    assert getattr(system, f"_{key}_by_id") == {7: first}
+
+
+# у студента и репетитора свои индексы: один user_id у обоих допустим
+def test_student_and_tutor_may_share_user_id():
+    system = EducationSystem()
+    student, tutor = _student(7), _tutor(7)
+    system.add_student(student)
+    system.add_tutor(tutor)
+    assert system._students_by_id[7] is student and system._tutors_by_id[7] is tutor
+
+
+# файл с двумя студентами с одним user_id не загружается, данные системы остаются прежними
+def test_file_with_duplicate_user_id_is_rejected(tmp_path):
+    system = random_system(2, 30)
+    filename = str(tmp_path / "system.json")
+    system.save_to_json(filename)
+    with open(filename, encoding="utf-8") as f:
+        data = json.load(f)
+    del data["checksum"], data["system_info"]["format_version"]
+    data["students"][1]["user_id"] = data["students"][0]["user_id"]
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+    before = system_state(system)
+    with pytest.raises(EducationException):
+        system.load_from_json(filename)
+    assert system_state(system) == before